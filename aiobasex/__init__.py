@@ -1,5 +1,9 @@
+from .admission import AdmissionControl
 from .connection import create_connection
+from .health import KeepAlive
+from .profiling import QueryProfiler
 from .session import BaseXSession
 
 
-__all__ = ['create_connection', 'BaseXSession']
+__all__ = ['create_connection', 'AdmissionControl', 'BaseXSession',
+           'KeepAlive', 'QueryProfiler']
@@ -0,0 +1,184 @@
+import logging
+import time
+
+from aiobasex import errors
+from aiobasex.health import ewma
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionControl:
+    """Admits requests to BaseX server, or rejects them fast under overload.
+
+    A single instance may be shared by several connections, to limit
+        their requests together, as a pool.
+
+    Requests are rejected with C{errors.RequestRejected}, when:
+        - the number of requests in flight reaches C{max_queue_depth};
+        - the estimated queue wait (requests in flight multiplied by
+            observed service time) exceeds C{max_queue_wait};
+        - the circuit breaker is open, i.e. C{failure_threshold}
+            consecutive requests failed or timed out (were cancelled
+            while waiting for response), and C{reset_timeout} seconds
+            did not pass since. After that, a single probe request
+            is admitted, and its outcome closes or re-opens the breaker.
+    """
+
+    # Circuit breaker states
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    # Request outcomes
+    SUCCESS = 'success'
+    FAILURE = 'failure'
+    TIMEOUT = 'timeout'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, *, max_queue_depth=None, max_queue_wait=None,
+                 failure_threshold=None, reset_timeout=30.0, smoothing=0.2,
+                 clock=time.monotonic):
+        """AdmissionControl ctor
+
+        :param max_queue_depth: Maximum number of requests in flight.
+        :type max_queue_depth: int
+        :param max_queue_wait: Maximum estimated queue wait, in seconds.
+        :type max_queue_wait: float
+        :param failure_threshold: Number of consecutive failures or
+            timeouts, opening the circuit breaker.
+        :type failure_threshold: int
+        :param reset_timeout: Seconds to keep the circuit breaker open.
+        :type reset_timeout: float
+        :param smoothing: Weight of the latest observation in
+            exponentially weighted moving average of service time.
+        :type smoothing: float
+        :param clock: A monotonic clock, returning seconds.
+        :type clock: callable
+        """
+        assert 0 < smoothing <= 1, 'smoothing must be within (0, 1].'
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._smoothing = smoothing
+        self._clock = clock
+        self._in_flight = 0
+        self._service_time = None
+        self._last_completion = None
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def __repr__(self):
+        return '<AdmissionControl: {} in flight, {}>'.format(
+            self._in_flight, self.state)
+
+    @property
+    def in_flight(self):
+        """Number of admitted requests, awaiting response."""
+        return self._in_flight
+
+    @property
+    def service_time(self):
+        """Observed service time of a single request, in seconds."""
+        return self._service_time
+
+    @property
+    def estimated_wait(self):
+        """Estimated time for a new request to wait in queue, in seconds."""
+        return self._in_flight * (self._service_time or 0.0)
+
+    @property
+    def state(self):
+        """State of circuit breaker."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def admit(self, n=1):
+        """Admit requests, each awaiting a response.
+
+        :param n: A number of responses to await.
+        :type n: int
+        :returns: Admission time, to be passed to C{release()}.
+        :rtype: float
+        :raises errors.CircuitOpen: When the circuit breaker is open.
+        :raises errors.RequestRejected: When the queue is saturated.
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise errors.CircuitOpen(
+                'Circuit breaker is open after {} consecutive failures'.format(
+                    self._failures))
+
+        if self.max_queue_depth is not None and \
+                self._in_flight + n > self.max_queue_depth:
+            raise errors.RequestRejected(
+                'Queue depth limit reached: {} requests in flight'.format(
+                    self._in_flight))
+
+        if self.max_queue_wait is not None and \
+                self.estimated_wait > self.max_queue_wait:
+            raise errors.RequestRejected(
+                'Estimated queue wait {:.3f}s exceeds limit'.format(
+                    self.estimated_wait))
+
+        if state == self.HALF_OPEN:
+            self._probing = True
+
+        self._in_flight += n
+        return self._clock()
+
+    def release(self, started, outcome=None):
+        """Release a single admitted request, once its response arrived,
+            or it was abandoned.
+
+        :param started: Admission time, returned by C{admit()}.
+        :type started: float
+        :param outcome: One of C{SUCCESS}, C{FAILURE}, C{TIMEOUT}
+            or C{CANCELLED}, or None, if it was already recorded
+            with C{record()}.
+        :type outcome: str
+        """
+        self._in_flight -= 1
+        if outcome is not None:
+            self.record(started, outcome)
+
+    def record(self, started, outcome):
+        """Record outcome of admitted request, without releasing it,
+            e.g. of a timed out one, which response is still awaited.
+
+        :param started: Admission time, returned by C{admit()}.
+        :type started: float
+        :param outcome: See C{release()}.
+        :type outcome: str
+        """
+        if outcome == self.CANCELLED:
+            self._probing = False
+            return
+
+        now = self._clock()
+        if self._last_completion is not None and \
+                self._last_completion > started:
+            started = self._last_completion
+        self._last_completion = now
+        self._service_time = ewma(self._service_time, now - started,
+                                  self._smoothing)
+
+        if outcome == self.SUCCESS:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        else:
+            self._failures += 1
+            if self._probing or (
+                    self.failure_threshold is not None and
+                    self._failures >= self.failure_threshold):
+                if self._opened_at is None or self._probing:
+                    logger.warning('Opening circuit breaker after %s '
+                                   'consecutive failures', self._failures)
+                self._opened_at = now
+                self._probing = False
@@ -0,0 +1,79 @@
+"""Conversion of numeric query results to typed arrays.
+
+Item values are converted from the raw item stream, without decoding
+    them to strings first. NumPy arrays are supported, if NumPy is
+    installed; they share memory with intermediate C{array.array}
+    when dtype allows that.
+"""
+import array
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+# Array typecodes of floating point numbers; others are integers.
+_FLOAT_TYPECODES = 'fd'
+
+
+def to_array(tokens, dtype=None, *, use_numpy=False):
+    """Convert numeric tokens to typed array.
+
+    :param tokens: Lexical forms of numbers.
+    :type tokens: list[bytes]
+    :param dtype: An C{array} typecode, or NumPy dtype with C{use_numpy}.
+        If omitted, integers are converted to 'q', other numbers to 'd'.
+    :param use_numpy: Whether to return NumPy array.
+    :type use_numpy: bool
+    :rtype: array.array|numpy.ndarray
+    :raises ValueError: When a token is not a number of given type.
+    """
+    if not use_numpy:
+        return _convert(tokens, dtype)
+
+    if numpy is None:
+        raise RuntimeError('NumPy is not installed.')
+
+    if dtype is None:
+        values = _convert(tokens, None)
+        return numpy.frombuffer(values, dtype=values.typecode)
+
+    dtype = numpy.dtype(dtype)
+    if dtype.char in array.typecodes and \
+            array.array(dtype.char).itemsize == dtype.itemsize:
+        values = _convert(tokens, dtype.char)
+        return numpy.frombuffer(values, dtype=dtype)
+    return numpy.array(_convert(tokens, None), dtype=dtype)
+
+
+def to_columns(tokens, dtypes, *, use_numpy=False):
+    """Convert numeric tokens of row-major tuples to typed columns.
+
+    :param tokens: Lexical forms of numbers, row after row.
+    :type tokens: list[bytes]
+    :param dtypes: Types of columns, see C{to_array()}.
+    :type dtypes: list
+    :param use_numpy: Whether to return NumPy arrays.
+    :type use_numpy: bool
+    :rtype: list[array.array|numpy.ndarray]
+    :raises ValueError: When tokens do not form complete rows.
+    """
+    n = len(dtypes)
+    assert n > 0, 'dtypes must not be empty.'
+    if len(tokens) % n:
+        raise ValueError('{} items do not form rows of {} columns'.format(
+            len(tokens), n))
+    return [to_array(tokens[i::n], dtype, use_numpy=use_numpy)
+            for i, dtype in enumerate(dtypes)]
+
+
+def _convert(tokens, typecode):
+    if typecode is None:
+        try:
+            return array.array('q', map(int, tokens))
+        except (ValueError, OverflowError):
+            return array.array('d', map(float, tokens))
+
+    convert = float if typecode in _FLOAT_TYPECODES else int
+    return array.array(typecode, map(convert, tokens))
@@ -4,7 +4,11 @@ import hashlib
 import logging
 
 
-from .errors import CannotAuthenticate
+from .admission import AdmissionControl
+from .errors import CannotAuthenticate, RequestRejected
+from .events import BaseXEventChannel
+from .health import LatencyStats
+from .utils import build_frame, read_items, read_string, write_frame
 
 
 logger = logging.getLogger(__name__)
@@ -12,7 +16,8 @@ logger = logging.getLogger(__name__)
 
 @asyncio.coroutine
 def create_connection(host='127.0.0.1', port=1984, *, username=None,
-                      password=None, encoding='utf-8', loop=None):
+                      password=None, encoding='utf-8', admission=None,
+                      keepalive=None, loop=None):
     """Create connection to baseX.
 
     :param host: A host, where BaseX server is listening.
@@ -26,6 +31,11 @@ def create_connection(host='127.0.0.1', port=1984, *, username=None,
     :type username: str
     :param password: A password to authenticate with.
     :type password: str
+    :param admission: An admission control, to reject requests fast,
+        when server or connection is saturated.
+    :type admission: aiobasex.admission.AdmissionControl
+    :param keepalive: Keepalive settings, to probe idle connection.
+    :type keepalive: aiobasex.health.KeepAlive
     :param loop: Asyncio`s event loop.
     :type loop: asyncio.BaseEventLoop
     """
@@ -34,7 +44,8 @@ def create_connection(host='127.0.0.1', port=1984, *, username=None,
     reader, writer = yield from asyncio.open_connection(host, port, loop=loop)
     connection = BaseXConnection(
         reader=reader, writer=writer, encoding=encoding,
-        address=(host, port), username=username, password=password, loop=loop)
+        address=(host, port), username=username, password=password,
+        admission=admission, keepalive=keepalive, loop=loop)
     yield from connection.wait_authenticated()
     return connection
 
@@ -53,8 +64,15 @@ class BaseXConnection(asyncio.Protocol):
     # Indicates errors.
     ERROR_TERM = b'\x01'
 
+    # Seconds of idleness, after which deferred messages are sent.
+    DEFERRED_FLUSH_DELAY = 0.05
+
+    # A cheap command, sent by probes: evaluates an empty query.
+    PROBE_COMMAND = 'XQUERY ()'
+
     def __init__(self, reader, writer, *,
-                 username, password, encoding, address, loop=None):
+                 username, password, encoding, address, admission=None,
+                 keepalive=None, loop=None):
         """BaseXConnection ctor
 
         :param reader: A reader for BaseX connection.
@@ -64,6 +82,10 @@ class BaseXConnection(asyncio.Protocol):
         :param address: A host-port pair, to be used in string representation
                         of this BaseXConnection.
         :type address: tuple]str,int]
+        :param admission: An optional admission control.
+        :type admission: aiobasex.admission.AdmissionControl
+        :param keepalive: Optional keepalive settings.
+        :type keepalive: aiobasex.health.KeepAlive
         :param loop: Asyncio`s event loop.
         :type loop: asyncio.BaseEventLoop
         """
@@ -81,15 +103,73 @@ class BaseXConnection(asyncio.Protocol):
         self._authenticated = asyncio.Future(loop=self._loop)
         self._closed = asyncio.Future(loop=self._loop)
         self._closing = False
+        self._events = None
+        self._admission = admission
+        self._recorder = None
+        self._stream = None
+        self._deferred = []
+        self._flush_handle = None
+        self._keepalive = keepalive
+        self._keepalive_task = None
+        self._latency = LatencyStats(
+            smoothing=keepalive.smoothing if keepalive else 0.2)
+        self._probe_failures = 0
+        self._last_received = self._loop.time()
 
     @property
     def loop(self):
         return self._loop
 
+    @property
+    def closed(self):
+        return self._closing
+
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def encoding(self):
+        return self._encoding
+
+    @property
+    def events(self):
+        """An event channel of this connection, created on first access.
+
+        :rtype: aiobasex.events.BaseXEventChannel
+        """
+        if self._events is None:
+            self._events = BaseXEventChannel(self)
+        return self._events
+
     @property
     def authenticated(self):
         return self._authenticated.done()
 
+    @property
+    def latency(self):
+        """Round-trip latency, measured by probes.
+
+        :rtype: aiobasex.health.LatencyStats
+        """
+        return self._latency
+
+    @property
+    def healthy(self):
+        """Whether this connection is open, and its probes neither
+            fail, nor show degraded latency."""
+        if self._closing:
+            return False
+        if self._reader_task is not None and self._reader_task.done():
+            return False
+        if self._keepalive is None:
+            return True
+        if self._probe_failures >= self._keepalive.failure_threshold:
+            return False
+        max_latency = self._keepalive.max_latency
+        return max_latency is None or self._latency.ewma is None or \
+            self._latency.ewma <= max_latency
+
     def __repr__(self):
         """Gets string representation of this BaseX connection."""
         return '<BaseXConnection: {}:{}{}>'.format(
@@ -106,55 +186,157 @@ class BaseXConnection(asyncio.Protocol):
         if not fut.exception():
             self._reader_task = asyncio.Task(
                 self._read_data(), loop=self._loop)
+            if self._keepalive is not None:
+                self._keepalive_task = asyncio.Task(
+                    self._keep_alive(), loop=self._loop)
 
     @asyncio.coroutine
-    def _read_msg(self):
+    def _read_msg(self, head=b''):
         """Read the message until the terminator is reached;
-            return the message without terminator."""
-
-        buf = b''
-
-        while True:
-            char = yield from self._reader.readexactly(1)
-
-            if char in (self.SUCCESS_TERM, self.ERROR_TERM):
-                if char == self.SUCCESS_TERM:
-                    if buf and buf[-1] == b'\xFF':
-                        buf = buf[:-1] + b'\x00'
-                        continue
-                    error = False
-                    break
-                elif char == self.ERROR_TERM:
-                    error = True
-                    break
-            else:
-                buf += char
-
-        data = buf.replace(b'\xFF\xFF', b'\xFF')
-        data_decoded = data.decode(self._encoding)
+            return the decoded message without terminator."""
+        data = yield from read_string(self._reader, head)
+        return data.decode(self._encoding)
 
-        return error, data_decoded
-
-    def send_msg(self, data, waiter=None, success_term_twice=False):
+    def send_msg(self, data, waiter=None, success_term_twice=False,
+                 error_follows=True, items=False):
         """Send the message to BaseX server.
 
-        :param data: A data to send.
-        :type data: bytes
-        :param waiter: A future, resolving on BaseX response.
-        :type waiter: asyncio.Future
+        :param data: A data to send, either as single buffer, or a frame
+            of buffers, built by C{frame()}.
+        :type data: bytes|list
+        :param waiter: A future, resolving on BaseX response, or a list of
+            futures, resolving on consecutive messages of the response.
+        :type waiter: asyncio.Future|list[asyncio.Future]
         :param success_term_twice:Whether to wait for success terminator twice.
+            For a list of waiters, applies to the last one.
         :type success_term_twice: bool
+        :param error_follows: Whether error status is followed by an error
+            message (Query Command Protocol), or the response message
+            itself describes the error (Command Protocol).
+        :type error_follows: bool
+        :param items: Whether the response is an item stream, which is
+            read with C{read_items()}, and resolves the waiter with raw
+            bytes, instead of a decoded message. For a list of waiters,
+            applies to the last one.
+        :type items: bool
+        :raises errors.RequestRejected: When rejected by admission control.
         """
+        admitted = None
+        if waiter and self._admission is not None:
+            # A request is admitted once, however many messages it awaits.
+            admitted = _Admitted(self._admission, self._admission.admit())
+
         if isinstance(data, str):
             data = data.encode(self._encoding)  # pragma: no cover
-        self._writer.write(data)
+
+        # Deferred messages are piggybacked onto this write.
+        buffers = self._take_deferred()
+        if buffers:
+            buffers.extend(data if isinstance(data, list) else [data])
+            write_frame(self._writer, buffers)
+        elif isinstance(data, list):
+            write_frame(self._writer, data)
+        else:
+            self._writer.write(data)
 
         if waiter:
-            if isinstance(waiter, list):
-                for _waiter in waiter:
-                    self._waiters.append((_waiter, success_term_twice))
+            self._enqueue(data, waiter, success_term_twice, error_follows,
+                          items, admitted)
+
+    def send_deferred(self, data, success_term_twice=True,
+                      error_follows=True):
+        """Queue the message, which response nobody waits for,
+            to be sent along with the next message, or when this
+            connection is idle for C{DEFERRED_FLUSH_DELAY} seconds.
+
+        :param data: A data to send, see C{send_msg()}.
+        :type data: bytes|list
+        :param success_term_twice: See C{send_msg()}.
+        :type success_term_twice: bool
+        :param error_follows: See C{send_msg()}.
+        :type error_follows: bool
+        :returns: A future, resolving on BaseX response.
+        :rtype: asyncio.Future
+        """
+        waiter = asyncio.Future(loop=self._loop)
+        waiter.add_done_callback(_log_deferred_response)
+        self._deferred.append(
+            (data, waiter, success_term_twice, error_follows))
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(
+                self.DEFERRED_FLUSH_DELAY, self.flush_deferred)
+        return waiter
+
+    def flush_deferred(self):
+        """Send all deferred messages in one batch."""
+        buffers = self._take_deferred()
+        if buffers:
+            write_frame(self._writer, buffers)
+
+    def _take_deferred(self):
+        """Register waiters of deferred messages; return their buffers."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._deferred or self._writer is None:
+            return []
+
+        buffers = []
+        for data, waiter, success_term_twice, error_follows in self._deferred:
+            if isinstance(data, list):
+                buffers.extend(data)
             else:
-                self._waiters.append((waiter, success_term_twice))
+                buffers.append(data)
+            self._enqueue(data, waiter, success_term_twice, error_follows,
+                          False, None)
+        self._deferred = []
+        return buffers
+
+    def _enqueue(self, data, waiter, success_term_twice, error_follows,
+                 items, admitted):
+        if self._recorder is not None:
+            self._recorder.track(
+                self._stream, data,
+                waiter if isinstance(waiter, list) else [waiter],
+                success_term_twice, error_follows, self._encoding,
+                items=items)
+
+        if waiter:
+            if isinstance(waiter, list):
+                # The request is released, once its last message arrives.
+                for _waiter in waiter[:-1]:
+                    if admitted is not None:
+                        _waiter.add_done_callback(admitted.waiter_done)
+                    self._waiters.append(
+                        (_waiter, False, error_follows, False, None))
+                waiter = waiter[-1]
+            if admitted is not None:
+                waiter.add_done_callback(admitted.waiter_done)
+            self._waiters.append(
+                (waiter, success_term_twice, error_follows, items, admitted))
+
+    def start_recording(self, recorder):
+        """Record requests, sent through this connection.
+
+        :param recorder: A recorder, which may be shared by connections.
+        :type recorder: aiobasex.recording.TrafficRecorder
+        """
+        self._recorder = recorder
+        self._stream = recorder.register()
+
+    def stop_recording(self):
+        """Stop recording requests."""
+        self._recorder = None
+        self._stream = None
+
+    def frame(self, code, *args):
+        """Build request frame, encoding strings with connection encoding.
+
+        :param code: A protocol command code.
+        :type code: bytes
+        :rtype: list
+        """
+        return build_frame(code, *args, encoding=self._encoding)
 
     @asyncio.coroutine
     def _authenticate(self):
@@ -163,7 +345,7 @@ class BaseXConnection(asyncio.Protocol):
              perform auth handshake.
         """
 
-        _, data = yield from self._read_msg()
+        data = yield from self._read_msg()
         if ':' in data:
             # Use 'digest' authentication method.
             realm, nonce = data.split(':')
@@ -198,21 +380,120 @@ class BaseXConnection(asyncio.Protocol):
     @asyncio.coroutine
     def _read_data(self):
         while not self._reader.at_eof() and not self._closing:
-            error, msg = yield from self._read_msg()
-            if not msg and not self._waiters:
-                continue
+            error = False
+            # Read mode depends on the waiter, which is known for sure
+            #  only once the response starts arriving.
+            head = yield from self._reader.readexactly(1)
+            if self._waiters and self._waiters[0][3]:
+                msg = yield from read_items(self._reader, head)
+            else:
+                msg = yield from self._read_msg(head)
+                if not msg and not self._waiters:
+                    continue
+
+                elif not self._waiters:
+                    # Possible busy loop!
+                    while not self._waiters:
+                        yield from asyncio.sleep(0)
+
+            waiter, do_additional_read, error_follows, _, admitted = \
+                self._waiters.popleft()
+            self._last_received = self._loop.time()
+
+            # Some commands do send additional status byte in results;
+            #  in case of failure, it may be followed by an error message.
+            if do_additional_read:
+                status = yield from self._reader.readexactly(1)
+                if status == self.ERROR_TERM:
+                    if error_follows:
+                        msg = yield from self._read_msg()
+                    error = True
 
-            elif not self._waiters:
-                # Possible busy loop!
-                while not self._waiters:
-                    yield from asyncio.sleep(0)
+            if admitted is not None:
+                admitted.release(
+                    AdmissionControl.TIMEOUT if waiter.cancelled() else
+                    AdmissionControl.FAILURE if error else
+                    AdmissionControl.SUCCESS)
 
-            waiter, do_additional_read = self._waiters.popleft()
+            if not waiter.cancelled():
+                waiter.set_result((error, msg))
 
-            # Some commands do send additional \x00 in results
-            if do_additional_read and not error:
-                yield from self._reader.readexactly(1)
-            waiter.set_result((error, msg))
+    @asyncio.coroutine
+    def probe(self, timeout=None):
+        """Send a no-op command, and measure its round-trip latency.
+
+        :param timeout: Seconds to wait for response; defaults to
+            keepalive timeout.
+        :type timeout: float
+        :returns: Latency in seconds, or None, if probe failed.
+        :rtype: float|None
+        """
+        if self._closing or self._reader_task is None:
+            return None
+        if timeout is None and self._keepalive is not None:
+            timeout = self._keepalive.timeout
+        healthy = self.healthy
+
+        waiters = [asyncio.Future(loop=self._loop),
+                   asyncio.Future(loop=self._loop)]
+        started = self._loop.time()
+        try:
+            self.send_msg(self.frame(b'', self.PROBE_COMMAND), waiter=waiters,
+                          success_term_twice=True, error_follows=False)
+        except RequestRejected as e:
+            # Not a failure of this connection.
+            logger.debug('Probe rejected: %s', e)
+            return None
+
+        latency = None
+        try:
+            # Responses arrive in order, so the last one completes the probe.
+            yield from asyncio.wait_for(waiters[-1], timeout, loop=self._loop)
+            if not any(waiter.result()[0] for waiter in waiters):
+                latency = self._loop.time() - started
+        except asyncio.TimeoutError:
+            logger.debug('Probe of %r timed out', self)
+        except asyncio.CancelledError:
+            if self._closing:
+                return None
+            raise
+        finally:
+            waiters[0].cancel()
+
+        if latency is None:
+            self._probe_failures += 1
+        else:
+            self._probe_failures = 0
+            self._latency.add(latency)
+
+        if healthy and not self.healthy:
+            logger.warning('%r is unhealthy: %s', self,
+                           'probe failed' if latency is None else
+                           'latency {:.3f} ms'.format(
+                               self._latency.ewma * 1000))
+        elif not healthy and self.healthy:
+            logger.info('%r is healthy again', self)
+        return latency
+
+    @asyncio.coroutine
+    def _keep_alive(self):
+        """Probe this connection, whenever it is idle, i.e. no requests
+            are outstanding, and nothing was received for a while."""
+        interval = self._keepalive.interval
+        while not self._closing:
+            if self._waiters or self._deferred:
+                # A probe would wait behind outstanding requests, and
+                #  time out, though the connection is alive.
+                yield from asyncio.sleep(interval, loop=self._loop)
+                continue
+            idle = self._loop.time() - self._last_received
+            if idle < interval:
+                yield from asyncio.sleep(interval - idle, loop=self._loop)
+                continue
+            latency = yield from self.probe()
+            if latency is None:
+                # Probe failed, or was rejected without yielding to loop.
+                yield from asyncio.sleep(interval, loop=self._loop)
 
     @asyncio.coroutine
     def wait_authenticated(self):
@@ -224,12 +505,57 @@ class BaseXConnection(asyncio.Protocol):
     @asyncio.coroutine
     def close(self):
         """Close this connection, and cancel all waiters."""
+        self.flush_deferred()
         self._closing = True
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+        if self._events is not None:
+            yield from self._events.close()
         self._reader_task.cancel()
         self._writer.transport.close()
         self._writer = None
         self._reader = None
         self._reader_task = None
         while self._waiters:
-            waiter = self._waiters.pop()
+            waiter, _, _, _, admitted = self._waiters.pop()
+            # Released before cancelling, not to be recorded as timeout.
+            if admitted is not None:
+                admitted.release(AdmissionControl.CANCELLED)
+            waiter.cancel()
+        for _, waiter, _, _ in self._deferred:
             waiter.cancel()
+        self._deferred = []
+
+
+class _Admitted:
+    """A request, admitted by admission control, which outcome is
+        recorded once: either when any of its waiters is cancelled
+        (timed out), or when its response arrives."""
+
+    __slots__ = ('_admission', '_started', '_recorded')
+
+    def __init__(self, admission, started):
+        self._admission = admission
+        self._started = started
+        self._recorded = False
+
+    def waiter_done(self, waiter):
+        if waiter.cancelled() and not self._recorded:
+            # Response is still awaited, so request stays in flight.
+            self._recorded = True
+            self._admission.record(self._started, AdmissionControl.TIMEOUT)
+
+    def release(self, outcome):
+        self._admission.release(self._started,
+                                None if self._recorded else outcome)
+        self._recorded = True
+
+
+def _log_deferred_response(fut):
+    if fut.cancelled():
+        return
+    error, msg = fut.result()
+    if error:
+        logger.warning('Deferred request failed: %s', msg)
+    else:
+        logger.debug('Deferred request succeeded: %s', msg)
@@ -0,0 +1,159 @@
+import asyncio
+import collections
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+# Wraps query body to select a window of its results.
+_WINDOW_TEMPLATE = '''declare variable ${offset} as xs:integer external;
+declare variable ${limit} as xs:integer external;
+subsequence(({query}), ${offset}, ${limit})'''
+
+
+def window_query(query, *, offset_var='offset', limit_var='limit'):
+    """Wrap query body, so it returns a window of its results,
+        selected by 1-based offset and limit external variables.
+
+    Query must not contain a prolog, i.e. declarations.
+
+    :param query: A query body.
+    :type query: str
+    :rtype: str
+    """
+    return _WINDOW_TEMPLATE.format(query=query, offset=offset_var,
+                                   limit=limit_var)
+
+
+class BaseXCursor:
+    """Pages through query results, prefetching next pages
+        while the current one is consumed.
+
+    Pages are executions of the same query, with offset and limit
+        external variables bound for each page. Iteration stops at
+        the first empty page, or at the first error.
+
+    Prefetched pages (and the query, with C{close_query}) are released,
+        once iteration is over. When iteration is left early, e.g. with
+        C{break}, the cursor must be closed with C{close()}, or used as
+        asynchronous context manager.
+
+    Usage::
+
+        async with await session.cursor('//item', page_size=500) as cursor:
+            async for page in cursor:
+                process(page)
+    """
+
+    def __init__(self, query, *, page_size=100, prefetch=2,
+                 offset_var='offset', limit_var='limit',
+                 target_page_bytes=None, min_page_size=1,
+                 max_page_size=10000, close_query=False):
+        """BaseXCursor ctor
+
+        :param query: A query, declaring offset and limit variables.
+        :type query: aiobasex.query.BaseXQuery
+        :param page_size: A number of items per page.
+        :type page_size: int
+        :param prefetch: A number of pages, requested ahead of the
+            page being consumed.
+        :type prefetch: int
+        :param offset_var: A name of 1-based offset variable.
+        :type offset_var: str
+        :param limit_var: A name of page size variable.
+        :type limit_var: str
+        :param target_page_bytes: If given, page size is adapted, so
+            that pages are about this size, based on observed size
+            of previous pages, encoded with connection encoding.
+        :type target_page_bytes: int
+        :param min_page_size: Lower bound for adapted page size.
+        :type min_page_size: int
+        :param max_page_size: Upper bound for adapted page size.
+        :type max_page_size: int
+        :param close_query: Whether to close query, once iteration is over.
+        :type close_query: bool
+        """
+        assert page_size > 0, 'page_size must be positive.'
+        assert prefetch >= 0, 'prefetch must not be negative.'
+        self._query = query
+        self._loop = query.connection.loop
+        self._encoding = query.connection.encoding
+        self.page_size = page_size
+        self._prefetch = prefetch
+        self._offset_var = offset_var
+        self._limit_var = limit_var
+        self._target_page_bytes = target_page_bytes
+        self._min_page_size = min_page_size
+        self._max_page_size = max_page_size
+        self._close_query = close_query
+        self._next_offset = 1
+        self._pending = collections.deque()
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __aenter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __aexit__(self, exc_type, exc_val, exc_tb):
+        yield from self.close()
+
+    @asyncio.coroutine
+    def __anext__(self):
+        if self._exhausted:
+            raise StopAsyncIteration
+
+        self._schedule()
+        limit, result = self._pending.popleft()
+        try:
+            page = yield from result
+        except Exception:
+            yield from self.close()
+            raise
+
+        if not page:
+            yield from self.close()
+            raise StopAsyncIteration
+
+        self._adapt(limit, page)
+        return page
+
+    def _schedule(self):
+        """Request pages, until C{prefetch} pages are requested ahead."""
+        while len(self._pending) <= self._prefetch:
+            limit = self.page_size
+            result = self._query.submit({
+                self._offset_var: (self._next_offset, 'xs:integer'),
+                self._limit_var: (limit, 'xs:integer'),
+            })
+            self._pending.append((limit, result))
+            self._next_offset += limit
+
+    def _adapt(self, limit, page):
+        if not self._target_page_bytes:
+            return
+        size = len(page.encode(self._encoding))
+        page_size = int(limit * self._target_page_bytes / size)
+        self.page_size = max(self._min_page_size,
+                             min(self._max_page_size, page_size))
+
+    @asyncio.coroutine
+    def close(self):
+        """Stop iteration, and discard prefetched pages."""
+        self._exhausted = True
+        while self._pending:
+            _, result = self._pending.popleft()
+            # Responses are still read in order; just drop the results.
+            result.add_done_callback(_drop_result)
+        if self._close_query:
+            self._close_query = False
+            yield from self._query.close()
+
+
+def _drop_result(fut):
+    if not fut.cancelled() and fut.exception() is not None:
+        logger.debug('Discarded prefetched page: %r', fut.exception())
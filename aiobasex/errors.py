@@ -6,6 +6,10 @@ class CannotAuthenticate(BaseException):
     """Raised, when authentication."""
 
 
+class CommandError(BaseXError):
+    """Raised, when server fails to execute a command."""
+
+
 class QueryError(BaseXError):
     """Raised, when invalid query identified by server."""
 
@@ -21,3 +25,11 @@ class CannotAddResource(BaseXError):
 class CannotReplaceResource(BaseXError):
     """Raised, when there was an error replacing
         existing resource at database."""
+
+
+class RequestRejected(BaseXError):
+    """Raised, when request is rejected by admission control."""
+
+
+class CircuitOpen(RequestRejected):
+    """Raised, when request is rejected, since circuit breaker is open."""
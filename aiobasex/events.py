@@ -0,0 +1,190 @@
+import asyncio
+import collections
+import logging
+
+from aiobasex import errors
+from aiobasex.utils import communicate_with_server, read_string, \
+    write_frame
+
+
+logger = logging.getLogger(__name__)
+
+
+Event = collections.namedtuple('Event', ['name', 'data'])
+
+
+class BaseXEventChannel:
+    """Subscribes to BaseX server events, and delivers them
+        either to callbacks, or to an asynchronous iterator.
+
+    Events are pushed by server through a dedicated event socket,
+        so they never interleave with responses, read by
+        C{BaseXConnection._read_data()}.
+
+    See http://docs.basex.org/wiki/Events for events description.
+    """
+
+    # Event protocol identifiers
+    _WATCH = b'\x0A'
+    _UNWATCH = b'\x0B'
+
+    def __init__(self, connection, *, max_queued=1000):
+        """BaseXEventChannel ctor
+
+        :param connection: A connection to subscribe at.
+        :type connection: aiobasex.connection.BaseXConnection
+        :param max_queued: Maximum number of events, awaiting iteration.
+            The oldest events are dropped, when exceeded.
+        :type max_queued: int
+        """
+        self._connection = connection
+        self._loop = connection.loop
+        self._callbacks = {}
+        self._queue = collections.deque(maxlen=max_queued)
+        self._queue_waiter = None
+        self._lock = asyncio.Lock(loop=self._loop)
+        self._event_address = None
+        self._event_reader = None
+        self._event_writer = None
+        self._listener_task = None
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        while not self._queue:
+            if self._closed:
+                raise StopAsyncIteration
+            self._queue_waiter = asyncio.Future(loop=self._loop)
+            yield from self._queue_waiter
+        return self._queue.popleft()
+
+    @property
+    def watched(self):
+        """Names of events, this channel is subscribed to."""
+        return frozenset(self._callbacks)
+
+    @asyncio.coroutine
+    def _open_event_socket(self):
+        """Connect to event port, and identify with session id."""
+        port, session_id = self._event_address
+        self._event_reader, self._event_writer = \
+            yield from asyncio.open_connection(
+                self._connection.host, int(port), loop=self._loop)
+        write_frame(self._event_writer,
+                    self._connection.frame(b'', session_id))
+        yield from self._event_reader.readexactly(1)
+
+        self._listener_task = asyncio.Task(self._listen(), loop=self._loop)
+
+    @asyncio.coroutine
+    def watch(self, name, callback=None):
+        """Subscribe to event.
+
+        :param name: A name of event. Bytes are decoded with connection
+            encoding, as notifications are dispatched by decoded names.
+        :type name: str|bytes
+        :param callback: A callable, invoked with an C{Event} on each
+            notification. If omitted, events are delivered to iterator.
+        :type callback: callable
+        """
+        name = self._decode_name(name)
+        with (yield from self._lock):
+            if self._closed:
+                raise errors.BaseXError('Event channel is closed')
+            # The whole request is sent at once, as other requests may
+            #  be pipelined on the connection. On the first one, server
+            #  responds with event port and session id, before the info.
+            waiters = [asyncio.Future(loop=self._loop)]
+            if self._event_address is None:
+                waiters = [asyncio.Future(loop=self._loop),
+                           asyncio.Future(loop=self._loop)] + waiters
+            self._connection.send_msg(
+                self._connection.frame(self._WATCH, name), waiter=waiters,
+                success_term_twice=True, error_follows=False)
+
+            if self._event_address is None:
+                _, port = yield from waiters[0]
+                _, session_id = yield from waiters[1]
+                self._event_address = port, session_id
+            if self._listener_task is None:
+                yield from self._open_event_socket()
+
+            error, info = yield from waiters[-1]
+            if error:
+                raise errors.CommandError(info)
+
+            self._callbacks[name] = callback
+            logger.info(info)
+
+    @asyncio.coroutine
+    def unwatch(self, name):
+        """Unsubscribe from event.
+
+        :param name: A name of event, see C{watch()}.
+        :type name: str|bytes
+        """
+        name = self._decode_name(name)
+        with (yield from self._lock):
+            error, info = yield from communicate_with_server(
+                self._connection,
+                self._connection.frame(self._UNWATCH, name),
+                loop=self._loop, success_term_twice=True, error_follows=False)
+            if error:
+                raise errors.CommandError(info)
+
+            self._callbacks.pop(name, None)
+            logger.info(info)
+
+    def _decode_name(self, name):
+        if isinstance(name, bytes):
+            return name.decode(self._connection.encoding)
+        return name
+
+    @asyncio.coroutine
+    def _read_string(self):
+        data = yield from read_string(self._event_reader)
+        return data.decode(self._connection.encoding)
+
+    @asyncio.coroutine
+    def _listen(self):
+        try:
+            while True:
+                name = yield from self._read_string()
+                data = yield from self._read_string()
+                self._dispatch(Event(name, data))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.info('Event socket closed by server')
+        finally:
+            self._close()
+
+    def _dispatch(self, event):
+        callback = self._callbacks.get(event.name)
+        if callback is not None:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception('Error in event callback for %s', event.name)
+            return
+
+        self._queue.append(event)
+        if self._queue_waiter is not None and not self._queue_waiter.done():
+            self._queue_waiter.set_result(None)
+
+    def _close(self):
+        self._closed = True
+        if self._event_writer is not None:
+            self._event_writer.transport.close()
+            self._event_writer = None
+        if self._queue_waiter is not None and not self._queue_waiter.done():
+            self._queue_waiter.set_result(None)
+
+    @asyncio.coroutine
+    def close(self):
+        """Close event socket, and stop iteration."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            self._listener_task = None
+        self._close()
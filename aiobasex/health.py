@@ -0,0 +1,98 @@
+import bisect
+
+
+# Upper bounds of latency histogram buckets, in milliseconds.
+BUCKETS = [0.125 * 2 ** i for i in range(16)]
+
+
+def ewma(average, value, smoothing):
+    """Update exponentially weighted moving average with a new value.
+
+    :param average: Current average, or None, if there is none yet.
+    :type average: float|None
+    :param value: A new observation.
+    :type value: float
+    :param smoothing: Weight of the new observation.
+    :type smoothing: float
+    :rtype: float
+    """
+    if average is None:
+        return value
+    return average + smoothing * (value - average)
+
+
+class KeepAlive:
+    """Keepalive settings, which may be shared by several connections.
+
+    A connection, idle for C{interval} seconds, sends a no-op command
+        to BaseX server, so that idle timeouts of intermediaries do not
+        close it, and measures its round-trip latency. The connection
+        is reported unhealthy, when C{failure_threshold} consecutive
+        probes failed or timed out, or when smoothed latency exceeds
+        C{max_latency}.
+    """
+
+    def __init__(self, *, interval=30.0, timeout=5.0, max_latency=None,
+                 failure_threshold=1, smoothing=0.2):
+        """KeepAlive ctor
+
+        :param interval: Seconds of idleness, after which a probe is sent.
+        :type interval: float
+        :param timeout: Seconds to wait for probe response.
+        :type timeout: float
+        :param max_latency: Maximum smoothed round-trip latency of a healthy
+            connection, in seconds.
+        :type max_latency: float
+        :param failure_threshold: Number of consecutive failed probes,
+            making connection unhealthy.
+        :type failure_threshold: int
+        :param smoothing: Weight of the latest observation in
+            exponentially weighted moving average of latency.
+        :type smoothing: float
+        """
+        assert interval > 0, 'interval must be positive.'
+        assert failure_threshold > 0, 'failure_threshold must be positive.'
+        assert 0 < smoothing <= 1, 'smoothing must be within (0, 1].'
+        self.interval = interval
+        self.timeout = timeout
+        self.max_latency = max_latency
+        self.failure_threshold = failure_threshold
+        self.smoothing = smoothing
+
+
+class LatencyStats:
+    """Round-trip latency of a connection, as exponentially weighted
+        moving average and histogram."""
+
+    def __init__(self, *, smoothing=0.2):
+        """LatencyStats ctor
+
+        :param smoothing: Weight of the latest observation in average.
+        :type smoothing: float
+        """
+        self._smoothing = smoothing
+        self._counts = [0] * (len(BUCKETS) + 1)
+        self.ewma = None
+        self.last = None
+        self.count = 0
+
+    def __repr__(self):
+        return '<LatencyStats: {} probes, ewma {}>'.format(
+            self.count,
+            '-' if self.ewma is None else '{:.3f} ms'.format(self.ewma * 1000))
+
+    def add(self, latency):
+        """Record a single round-trip latency, in seconds."""
+        self.last = latency
+        self.count += 1
+        self._counts[bisect.bisect_left(BUCKETS, latency * 1000)] += 1
+        self.ewma = ewma(self.ewma, latency, self._smoothing)
+
+    def histogram(self):
+        """Count latencies per bucket.
+
+        :returns: Pairs of bucket upper bound in milliseconds
+            (None for the last, unbounded one) and count.
+        :rtype: list[tuple[float|None,int]]
+        """
+        return list(zip(BUCKETS + [None], self._counts))
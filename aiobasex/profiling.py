@@ -0,0 +1,201 @@
+import collections
+import logging
+import random
+import re
+
+
+logger = logging.getLogger(__name__)
+
+
+# Matches timing lines of INFO output, e.g. "Compiling: 0.05 ms".
+_TIMING_RE = re.compile(r'^(?P<name>[A-Za-z ]+):\s+(?P<value>[\d.]+)\s+ms$')
+
+# Matches counter lines of INFO output, e.g. "Hit(s): 3 Items".
+_COUNTER_RE = re.compile(r'^(?P<name>[A-Za-z() ]+):\s+(?P<value>\d+)\s+\w+$')
+
+# Multi-line sections of INFO output.
+_SECTIONS = {
+    'Query': 'query',
+    'Compiling': 'compiling',
+    'Optimized Query': 'optimized_query',
+    'Query Plan': 'plan',
+}
+
+
+class QueryInfo:
+    """Structured representation of BaseX query INFO output.
+
+    :ivar timings: Server-side timings in milliseconds, keyed by lowercased
+        stage name, e.g. ``parsing``, ``compiling``, ``evaluating``,
+        ``printing`` and ``total time``.
+    :ivar counters: Integer counters, e.g. ``hit(s)``, ``updated``,
+        ``printed``.
+    :ivar locking: Read and write locks, held by query.
+    :ivar query: A query text, as seen by server.
+    :ivar compiling: Compilation steps, reported by server.
+    :ivar optimized_query: An optimized query.
+    :ivar plan: A query plan, if XMLPLAN option is enabled at server.
+    :ivar raw: Unparsed INFO text.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.timings = {}
+        self.counters = {}
+        self.locking = {}
+        self.query = None
+        self.compiling = None
+        self.optimized_query = None
+        self.plan = None
+        self._parse(raw)
+
+    def __repr__(self):
+        return '<QueryInfo: total={!r} ms>'.format(self.total)
+
+    @property
+    def total(self):
+        """Total server-side time in milliseconds, if reported."""
+        return self.timings.get('total time')
+
+    def _parse(self, raw):
+        section, lines = None, []
+
+        for line in raw.splitlines():
+            stripped = line.strip()
+
+            if stripped.endswith(':') and stripped[:-1] in _SECTIONS:
+                self._end_section(section, lines)
+                section, lines = _SECTIONS[stripped[:-1]], []
+                continue
+
+            timing = _TIMING_RE.match(stripped)
+            counter = _COUNTER_RE.match(stripped)
+            if timing:
+                self._end_section(section, lines)
+                section, lines = None, []
+                self.timings[timing.group('name').lower()] = float(
+                    timing.group('value'))
+            elif counter:
+                self.counters[counter.group('name').lower()] = int(
+                    counter.group('value'))
+            elif ' Locking:' in stripped:
+                name, _, value = stripped.partition(':')
+                self.locking[name.lower()] = value.strip()
+            elif section is not None:
+                lines.append(line)
+
+        self._end_section(section, lines)
+
+    def _end_section(self, section, lines):
+        if section is not None:
+            setattr(self, section, '\n'.join(lines).strip() or None)
+
+
+class QueryStats:
+    """Aggregated timings of a single query text.
+
+    All times are in milliseconds.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.server_count = 0
+        self.server_total = 0.0
+        self.server_timings = collections.Counter()
+
+    def __repr__(self):
+        return '<QueryStats: count={} total={:.3f} ms mean={:.3f} ms>'.format(
+            self.count, self.total, self.mean)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def server_mean(self):
+        """Mean server-side time of executions, recorded with info."""
+        return self.server_total / self.server_count \
+            if self.server_count else 0.0
+
+    def add(self, elapsed, info=None):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if info is not None:
+            self.server_count += 1
+            self.server_total += info.total or 0.0
+            self.server_timings.update(info.timings)
+
+
+class QueryProfiler:
+    """Samples query executions, and keeps an aggregated slow-query log.
+
+    A profiler is opt-in: pass it to C{BaseXSession}, and queries,
+        registered with that session, will report to it.
+
+    Only C{BaseXQuery.execute()} is sampled. Pipelined executions, i.e.
+        C{execute_many()}, C{submit()} and cursors, are not profiled,
+        since server-side info of each would cost another round-trip.
+
+    :param sample_rate: A fraction of executions to profile, from 0 to 1.
+    :type sample_rate: float
+    :param slow_threshold: Round-trip time in milliseconds, above which
+        an execution is logged as slow. None disables logging.
+    :type slow_threshold: float
+    :param server_timings: Whether to fetch server-side timings with INFO
+        after each sampled execution (costs one more round-trip).
+    :type server_timings: bool
+    """
+
+    def __init__(self, sample_rate=1.0, *, slow_threshold=None,
+                 server_timings=True):
+        assert 0 <= sample_rate <= 1, 'sample_rate must be within [0, 1].'
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.server_timings = server_timings
+        self._stats = {}
+
+    def should_sample(self):
+        """Decide, whether to profile the next execution."""
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, query, elapsed, info=None):
+        """Record a single query execution.
+
+        :param query: A query text.
+        :type query: str
+        :param elapsed: Client-side round-trip time in milliseconds.
+        :type elapsed: float
+        :param info: Server-side query info, if available.
+        :type info: QueryInfo
+        """
+        stats = self._stats.get(query)
+        if stats is None:
+            stats = self._stats[query] = QueryStats(query)
+        stats.add(elapsed, info)
+
+        if self.slow_threshold is not None and elapsed > self.slow_threshold:
+            logger.warning('Slow query (%.3f ms, server %s ms): %s',
+                           elapsed, info.total if info else None, query)
+
+    def slow_queries(self, n=10, *, key='total'):
+        """Get top-N queries, ordered by given key.
+
+        :param n: A number of queries to return.
+        :type n: int
+        :param key: Either 'total', 'mean', 'max' or 'count'.
+        :type key: str
+        :rtype: list[QueryStats]
+        """
+        assert key in ('total', 'mean', 'max', 'count'), \
+            'Unsupported key: {!r}'.format(key)
+        return sorted(self._stats.values(),
+                      key=lambda stats: getattr(stats, key),
+                      reverse=True)[:n]
+
+    def reset(self):
+        """Drop all collected statistics."""
+        self._stats.clear()
@@ -1,8 +1,9 @@
 import asyncio
+import collections
 import logging
 
-from aiobasex import errors
-from aiobasex.utils import communicate_with_server, string_args_to_bytes
+from aiobasex import arrays, errors, profiling
+from aiobasex.utils import communicate_with_server, item_tokens, split_items
 
 
 logger = logging.getLogger(__name__)
@@ -20,10 +21,53 @@ class BaseXQuery:
     _UPDATING = b'\x1E'
     _FULL = b'\x1F'
 
-    def __init__(self, connection, query_id):
+    def __init__(self, connection, query_id, *, query=None, profiler=None,
+                 lazy_close=False, close_on_gc=False):
+        """BaseXQuery ctor
+
+        :param connection: A connection, at which the query is registered.
+        :type connection: aiobasex.connection.BaseXConnection
+        :param query_id: An identifier of query, assigned by server.
+        :type query_id: str
+        :param query: A query text, used to aggregate profiling data.
+        :type query: str
+        :param profiler: An optional profiler to report executions to.
+        :type profiler: aiobasex.profiling.QueryProfiler
+        :param lazy_close: Whether C{close()} defers CLOSE request, to be
+            sent along with the next request on the connection.
+        :type lazy_close: bool
+        :param close_on_gc: Whether to close the query, if it is garbage
+            collected without being closed.
+        :type close_on_gc: bool
+        """
+        self._closed = False
         self._connection = connection
         self._loop = connection.loop
         self._query_id = query_id.encode('utf-8')
+        self._query = query
+        self._profiler = profiler
+        self._lazy_close = lazy_close
+        self._close_on_gc = close_on_gc
+
+    def __del__(self):
+        if self._closed or not self._close_on_gc:
+            return
+        if self._connection.closed or self._loop.is_closed():
+            return
+        logger.warning('Query %s was not closed, closing it on collection',
+                       self._query_id.decode('utf-8'))
+        self._closed = True
+        self._loop.call_soon_threadsafe(
+            self._connection.send_deferred,
+            self._connection.frame(self._CLOSE, self._query_id))
+
+    @asyncio.coroutine
+    def __aenter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __aexit__(self, exc_type, exc_val, exc_tb):
+        yield from self.close()
 
     def __eq__(self, other):
         return self._query_id == other.query_id
@@ -32,16 +76,38 @@ class BaseXQuery:
     def query_id(self):
         return self._query_id
 
-    def _communicate(self, to_send, success_term_twice=False):
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _communicate(self, to_send, success_term_twice=False, items=False):
         return communicate_with_server(self._connection, to_send,
-                                       loop=self._loop)
+                                       loop=self._loop,
+                                       success_term_twice=success_term_twice,
+                                       items=items)
 
     @asyncio.coroutine
     def close(self):
-        """Closes this Query."""
+        """Closes this Query.
+
+        With C{lazy_close}, CLOSE request is deferred, to be sent along
+            with the next request on the connection, or once connection
+            is idle, and its response is not waited for.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        frame = self._connection.frame(self._CLOSE, self._query_id)
+        if self._lazy_close:
+            self._connection.send_deferred(frame)
+            return
+
         error, result = yield from self._communicate(
-            self._CLOSE + self._query_id + self._connection.SUCCESS_TERM,
-            success_term_twice=True)
+            frame, success_term_twice=True)
         if error:
             raise errors.QueryError(result)
         logger.info(result)
@@ -49,8 +115,27 @@ class BaseXQuery:
     @asyncio.coroutine
     def execute(self):
         """Executes the Query."""
+        if self._profiler is not None and self._profiler.should_sample():
+            return (yield from self._profiled_execute())
+        return (yield from self._execute())
+
+    @asyncio.coroutine
+    def _profiled_execute(self):
+        started = self._loop.time()
+        result = yield from self._execute()
+        elapsed = (self._loop.time() - started) * 1000
+
+        info = None
+        if self._profiler.server_timings:
+            info = yield from self.info()
+
+        self._profiler.record(self._query, elapsed, info)
+        return result
+
+    @asyncio.coroutine
+    def _execute(self):
         error, result = yield from self._communicate(
-            self._EXECUTE + self._query_id + self._connection.SUCCESS_TERM,
+            self._connection.frame(self._EXECUTE, self._query_id),
             success_term_twice=True,
         )
         if error:
@@ -59,39 +144,183 @@ class BaseXQuery:
 
     @asyncio.coroutine
     def results(self):
-        """Retrieves query results."""
+        """Retrieves query results, separated with newlines."""
+        items = yield from self._results()
+        encoding = self._connection.encoding
+        return '\n'.join(item.decode(encoding) for item in split_items(items))
+
+    @asyncio.coroutine
+    def results_array(self, dtype=None, *, use_numpy=False):
+        """Retrieves numeric query results as a typed array,
+            parsed from raw item stream.
+
+        :param dtype: An C{array} typecode, or NumPy dtype with C{use_numpy}.
+            If omitted, integers are converted to 'q', other numbers to 'd'.
+        :param use_numpy: Whether to return NumPy array.
+        :type use_numpy: bool
+        :rtype: array.array|numpy.ndarray
+        :raises ValueError: When results are not numbers of given type.
+        """
+        items = yield from self._results()
+        return arrays.to_array(item_tokens(items), dtype, use_numpy=use_numpy)
+
+    @asyncio.coroutine
+    def results_columns(self, dtypes, *, use_numpy=False):
+        """Retrieves numeric query results, being a flat sequence of
+            tuples, e.g. C{for $r in $rows return ($r/@id, $r/@price)},
+            as a typed array per tuple member.
+
+        :param dtypes: Types of columns, see C{results_array()}.
+        :type dtypes: list
+        :param use_numpy: Whether to return NumPy arrays.
+        :type use_numpy: bool
+        :rtype: list[array.array|numpy.ndarray]
+        :raises ValueError: When results are not numbers of given types,
+            or do not form complete tuples.
+        """
+        items = yield from self._results()
+        return arrays.to_columns(item_tokens(items), dtypes,
+                                 use_numpy=use_numpy)
+
+    @asyncio.coroutine
+    def _results(self):
         error, result = yield from self._communicate(
-            self._RESULTS + self._query_id + self._connection.SUCCESS_TERM,
-            success_term_twice=True)
+            self._connection.frame(self._RESULTS, self._query_id),
+            success_term_twice=True, items=True)
+        if error:
+            raise errors.QueryError(result)
+        return result
+
+    @asyncio.coroutine
+    def info(self):
+        """Retrieves server-side query info of the last execution.
+
+        :rtype: aiobasex.profiling.QueryInfo
+        """
+        error, result = yield from self._communicate(
+            self._connection.frame(self._INFO, self._query_id),
+            success_term_twice=True,
+        )
         if error:
             raise errors.QueryError(result)
-        return result[1:]
+        return profiling.QueryInfo(result)
 
-    @string_args_to_bytes(1, 2, 3)
     @asyncio.coroutine
-    def bind(self, var, value, type=b''):
+    def bind(self, var, value, type=''):
         """Bind variable to a query."""
 
         error, result = yield from self._communicate(
-            self._BIND + self._query_id +
-            self._connection.SUCCESS_TERM + var +
-            self._connection.SUCCESS_TERM + value +
-            self._connection.SUCCESS_TERM + type +
-            self._connection.SUCCESS_TERM, success_term_twice=True
-        )
+            self._connection.frame(
+                self._BIND, self._query_id, var, value, type),
+            success_term_twice=True)
         if error:
             raise errors.QueryError(result)
         logger.info(result)
 
-    @string_args_to_bytes(1, 2)
     @asyncio.coroutine
-    def context(self, value, type=b''):
+    def execute_many(self, bindings, *, sessions=None, window=64):
+        """Executes the Query once per binding set, and returns results
+            in input order.
+
+        Bind and execute frames for many binding sets are pipelined
+            on the same query id, so the whole batch costs about one
+            round-trip per C{window} binding sets, instead of
+            two round-trips per binding set.
+
+        :param bindings: Binding sets, each mapping variable name to either
+            a value, or a (value, type) pair.
+        :type bindings: iterable[dict]
+        :param sessions: Additional sessions (e.g. on pooled connections)
+            to spread binding sets across. The query is registered at
+            each of them for the duration of the call.
+        :type sessions: list[aiobasex.session.BaseXSession]
+        :param window: Maximum number of binding sets in flight
+            per connection.
+        :type window: int
+        :rtype: list[str]
+        """
+        assert window > 0, 'window must be positive.'
+        bindings = list(bindings)
+
+        if not sessions:
+            return (yield from self._execute_pipelined(bindings, window))
+
+        assert self._query is not None, \
+            'Query text is required to spread execution across sessions.'
+        queries = [self]
+        try:
+            for session in sessions:
+                queries.append((yield from session.query(self._query)))
+
+            n = len(queries)
+            partial = yield from asyncio.gather(*[
+                q._execute_pipelined(bindings[i::n], window)
+                for i, q in enumerate(queries)
+            ], loop=self._loop)
+        finally:
+            yield from asyncio.gather(
+                *[q.close() for q in queries[1:]],
+                loop=self._loop, return_exceptions=True)
+
+        return [partial[i % n][i // n] for i in range(len(bindings))]
+
+    def submit(self, binding=None):
+        """Bind variables and execute the Query, without waiting
+            for previously submitted executions to complete.
+
+        :param binding: A binding set, mapping variable name to either
+            a value, or a (value, type) pair.
+        :type binding: dict
+        :returns: A future, resolving on execution result.
+        :rtype: asyncio.Future
+        """
+        return asyncio.Task(_gather_result(self._send_binding(binding or {})),
+                            loop=self._loop)
+
+    def _send_binding(self, binding):
+        waiters = []
+        for var, value in binding.items():
+            value, type = value if isinstance(value, tuple) \
+                else (value, '')
+            waiter = asyncio.Future(loop=self._loop)
+            self._connection.send_msg(
+                self._connection.frame(
+                    self._BIND, self._query_id, var, value, type),
+                waiter=waiter, success_term_twice=True)
+            waiters.append(waiter)
+
+        waiter = asyncio.Future(loop=self._loop)
+        self._connection.send_msg(
+            self._connection.frame(self._EXECUTE, self._query_id),
+            waiter=waiter, success_term_twice=True)
+        waiters.append(waiter)
+        return waiters
+
+    @asyncio.coroutine
+    def _execute_pipelined(self, bindings, window):
+        in_flight = collections.deque()
+        results = []
+
+        for binding in bindings:
+            in_flight.append(self._send_binding(binding))
+
+            if len(in_flight) >= window:
+                waiters = in_flight.popleft()
+                results.append((yield from _gather_result(waiters)))
+
+        while in_flight:
+            waiters = in_flight.popleft()
+            results.append((yield from _gather_result(waiters)))
+
+        return results
+
+    @asyncio.coroutine
+    def context(self, value, type=''):
         """Bind context variable to a query."""
         error, result = yield from self._communicate(
-            self._CONTEXT + self._query_id +
-            self._connection.SUCCESS_TERM + value +
-            self._connection.SUCCESS_TERM + type +
-            self._connection.SUCCESS_TERM, success_term_twice=True,
+            self._connection.frame(
+                self._CONTEXT, self._query_id, value, type),
+            success_term_twice=True,
         )
         if error:
             raise errors.QueryError(result)
@@ -101,9 +330,66 @@ class BaseXQuery:
     def updating(self):
         """Determine, if query updating."""
         error, result = yield from self._communicate(
-            self._UPDATING + self._query_id + self._connection.SUCCESS_TERM,
+            self._connection.frame(self._UPDATING, self._query_id),
             success_term_twice=True,
         )
         if error:
             raise errors.QueryError(result)
         return True if result == 'true' else False
+
+
+class QueryContextManager:
+    """Awaitable, resolving on registered C{BaseXQuery}, which can also
+        be used as asynchronous context manager, closing the query on exit.
+
+    Usage::
+
+        query = await session.query('1 to 10')
+
+        async with session.query('1 to 10') as query:
+            result = await query.execute()
+    """
+
+    __slots__ = ('_coro', '_query')
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._query = None
+
+    def send(self, value):
+        return self._coro.send(value)
+
+    def throw(self, typ, val=None, tb=None):
+        if val is None:
+            return self._coro.throw(typ)
+        if tb is None:
+            return self._coro.throw(typ, val)
+        return self._coro.throw(typ, val, tb)
+
+    def close(self):
+        return self._coro.close()
+
+    def __iter__(self):
+        return (yield from self._coro)
+
+    __await__ = __iter__
+
+    @asyncio.coroutine
+    def __aenter__(self):
+        self._query = yield from self._coro
+        return self._query
+
+    @asyncio.coroutine
+    def __aexit__(self, exc_type, exc_val, exc_tb):
+        yield from self._query.close()
+
+
+@asyncio.coroutine
+def _gather_result(waiters):
+    """Wait for pipelined responses; return result of the last one."""
+    result = None
+    for waiter in waiters:
+        error, result = yield from waiter
+        if error:
+            raise errors.QueryError(result)
+    return result
@@ -0,0 +1,191 @@
+import logging
+import struct
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+# Identifies traffic log files.
+MAGIC = b'AIOBASEX-TRAFFIC-1\n'
+
+# Record header: stream id, send time offset (s), latency (s),
+#   response size (bytes), number of waiters, flags, frame size,
+#   result size.
+_HEADER = struct.Struct('<HdfIBBII')
+
+# Record flags
+SUCCESS_TERM_TWICE = 0x01
+ERROR_FOLLOWS = 0x02
+ERROR = 0x04
+ITEMS = 0x08
+
+# Frames, which results are recorded, since replay needs them.
+_QUERY = b'\x00'
+
+
+class Record:
+    """A single request, recorded with its response size and timing."""
+
+    __slots__ = ('stream', 'time', 'latency', 'response_size', 'waiters',
+                 'flags', 'frame', 'result')
+
+    def __init__(self, stream, time, latency, response_size, waiters, flags,
+                 frame, result=b''):
+        self.stream = stream
+        self.time = time
+        self.latency = latency
+        self.response_size = response_size
+        self.waiters = waiters
+        self.flags = flags
+        self.frame = frame
+        self.result = result
+
+    def __repr__(self):
+        return '<Record: stream={} time={:.6f} latency={:.6f}>'.format(
+            self.stream, self.time, self.latency)
+
+    @property
+    def success_term_twice(self):
+        return bool(self.flags & SUCCESS_TERM_TWICE)
+
+    @property
+    def error_follows(self):
+        return bool(self.flags & ERROR_FOLLOWS)
+
+    @property
+    def error(self):
+        return bool(self.flags & ERROR)
+
+    @property
+    def items(self):
+        return bool(self.flags & ITEMS)
+
+
+class TrafficRecorder:
+    """Records request frames, response sizes and timings
+        of one or more connections to a compact binary log.
+
+    Usage::
+
+        recorder = TrafficRecorder('traffic.log')
+        connection.start_recording(recorder)
+        ...
+        connection.stop_recording()
+        recorder.close()
+    """
+
+    def __init__(self, path, *, clock=time.monotonic):
+        """TrafficRecorder ctor
+
+        :param path: A path to log file, which is overwritten.
+        :type path: str
+        :param clock: A monotonic clock, returning seconds.
+        :type clock: callable
+        """
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._clock = clock
+        self._started = clock()
+        self._streams = 0
+
+    def register(self):
+        """Register a connection to record; return its stream id.
+
+        :rtype: int
+        """
+        self._streams += 1
+        return self._streams - 1
+
+    def track(self, stream, data, waiters, success_term_twice,
+              error_follows, encoding, *, items=False):
+        """Record a request, once all its waiters are done.
+
+        :param stream: A stream id, returned by C{register()}.
+        :type stream: int
+        :param data: A request, sent to server.
+        :type data: bytes|list
+        :param waiters: Futures, resolving on response messages.
+        :type waiters: list[asyncio.Future]
+        :param success_term_twice: As passed to C{send_msg()}.
+        :type success_term_twice: bool
+        :param error_follows: As passed to C{send_msg()}.
+        :type error_follows: bool
+        :param encoding: An encoding of connection.
+        :type encoding: str
+        :param items: As passed to C{send_msg()}.
+        :type items: bool
+        """
+        if isinstance(data, list):
+            data = b''.join(data)
+        sent = self._clock()
+        flags = ((SUCCESS_TERM_TWICE if success_term_twice else 0) |
+                 (ERROR_FOLLOWS if error_follows else 0) |
+                 (ITEMS if items else 0))
+        pending = [len(waiters)]
+
+        def done(_):
+            pending[0] -= 1
+            if pending[0]:
+                return
+            self._write(stream, sent, flags, data, waiters, encoding)
+
+        for waiter in waiters:
+            waiter.add_done_callback(done)
+
+    def _write(self, stream, sent, flags, frame, waiters, encoding):
+        if self._file is None:
+            return
+
+        latency = self._clock() - sent
+        size = 0
+        result = b''
+        for waiter in waiters:
+            if waiter.cancelled():
+                flags |= ERROR
+                continue
+            error, msg = waiter.result()
+            if isinstance(msg, str):
+                msg = msg.encode(encoding)
+            size += len(msg)
+            if error:
+                flags |= ERROR
+            elif frame[:1] == _QUERY:
+                result = msg
+
+        self._file.write(_HEADER.pack(
+            stream, sent - self._started, latency, size, len(waiters),
+            flags, len(frame), len(result)))
+        self._file.write(frame)
+        self._file.write(result)
+
+    def close(self):
+        """Flush and close log file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_records(path):
+    """Read records from traffic log, ordered by send time.
+
+    :param path: A path to log file.
+    :type path: str
+    :rtype: list[Record]
+    """
+    records = []
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('Not a traffic log: {}'.format(path))
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                break
+            (stream, sent, latency, size, waiters, flags, frame_size,
+             result_size) = _HEADER.unpack(header)
+            frame = f.read(frame_size)
+            result = f.read(result_size)
+            records.append(Record(stream, sent, latency, size, waiters,
+                                  flags, frame, result))
+    records.sort(key=lambda record: record.time)
+    return records
@@ -0,0 +1,349 @@
+"""Replays traffic, recorded with C{aiobasex.recording.TrafficRecorder},
+    against BaseX server, or against in-process stand-in server, and reports
+    throughput, latency histogram and error rate.
+
+Usage: python -m aiobasex.replay traffic.log --speed 5 --concurrency 10 \\
+    [--stand-in | --host HOST --port PORT --username USER --password PASS]
+"""
+import argparse
+import asyncio
+import collections
+import logging
+import sys
+
+from aiobasex.connection import create_connection
+from aiobasex.health import BUCKETS, LatencyStats
+from aiobasex.recording import read_records
+from aiobasex.utils import read_string
+
+
+logger = logging.getLogger(__name__)
+
+
+# Query registration code; its response is a query id.
+_QUERY = b'\x00'
+
+# Query Command Protocol codes, followed by query id.
+_QUERY_ID_CODES = frozenset(b'\x02\x03\x04\x05\x06\x07\x0E\x1E\x1F')
+
+# Event subscription codes, which require event socket, and are not replayed.
+_EVENT_CODES = frozenset(b'\x0A\x0B')
+
+
+class ReplayStats:
+    """Collects latencies and errors of replayed requests."""
+
+    def __init__(self):
+        self.latencies = []
+        self._histogram = LatencyStats()
+        self.errors = 0
+        self.skipped = 0
+        self.duration = 0.0
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        """Replayed requests per second."""
+        return self.requests / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self):
+        return self.errors / self.requests if self.requests else 0.0
+
+    def add(self, latency, error):
+        self.latencies.append(latency)
+        self._histogram.add(latency)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p):
+        """Latency percentile, in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * p / 100))
+        return latencies[index] * 1000
+
+    def histogram(self):
+        """Count requests per latency bucket,
+            see C{aiobasex.health.LatencyStats.histogram()}."""
+        return self._histogram.histogram()
+
+    def report(self):
+        lines = [
+            'requests: {}, errors: {} ({:.2%}), skipped: {}'.format(
+                self.requests, self.errors, self.error_rate, self.skipped),
+            'duration: {:.3f} s, throughput: {:.1f} req/s'.format(
+                self.duration, self.throughput),
+            'latency, ms: p50 {:.3f}, p90 {:.3f}, p99 {:.3f}, '
+            'max {:.3f}'.format(
+                self.percentile(50), self.percentile(90),
+                self.percentile(99), self.percentile(100)),
+            'histogram, ms:',
+        ]
+        most = max([count for _, count in self.histogram()] + [1])
+        for bound, count in self.histogram():
+            if not count:
+                continue
+            label = '<= {:g}'.format(bound) if bound else '> {:g}'.format(
+                BUCKETS[-1])
+            lines.append('  {:>10} {:>8} {}'.format(
+                label, count, '#' * (40 * count // most)))
+        return '\n'.join(lines)
+
+
+@asyncio.coroutine
+def _replay_record(connection, record, ids, stats, loop):
+    """Send recorded frame, substituting query ids, assigned by server."""
+    frame = record.frame
+    code = frame[0] if frame else None
+
+    if code in _EVENT_CODES:
+        stats.skipped += 1
+        return
+
+    if code in _QUERY_ID_CODES:
+        old_id, _, rest = frame[1:].partition(b'\x00')
+        if old_id in ids:
+            new_id = yield from ids[old_id]
+            if new_id is not None:
+                frame = frame[:1] + new_id + b'\x00' + rest
+
+    registration = None
+    if code == _QUERY[0] and record.result:
+        registration = ids[record.result] = asyncio.Future(loop=loop)
+
+    waiters = [asyncio.Future(loop=loop) for _ in range(record.waiters)]
+    started = loop.time()
+    responses = []
+    try:
+        connection.send_msg(frame, waiter=waiters,
+                            success_term_twice=record.success_term_twice,
+                            error_follows=record.error_follows,
+                            items=record.items)
+        for waiter in waiters:
+            responses.append((yield from waiter))
+        error = any(msg_error for msg_error, _ in responses)
+    except Exception as e:
+        logger.debug('Replayed request failed: %r', e)
+        error = True
+    finally:
+        stats.add(loop.time() - started, error)
+
+    if registration is not None:
+        registration.set_result(
+            None if error else responses[0][1].encode(connection.encoding))
+
+
+@asyncio.coroutine
+def _replay_streams(connection, records, first, speed, stats, loop):
+    ids = collections.defaultdict(dict)
+    tasks = []
+    started = loop.time()
+    for record in records:
+        delay = started + (record.time - first) / speed - loop.time()
+        if delay > 0:
+            yield from asyncio.sleep(delay, loop=loop)
+        tasks.append(asyncio.Task(_replay_record(
+            connection, record, ids[record.stream], stats, loop), loop=loop))
+    yield from asyncio.gather(*tasks, loop=loop)
+
+
+@asyncio.coroutine
+def replay(records, connect, *, speed=1.0, concurrency=1, loop=None):
+    """Replay recorded requests through several connections at once.
+
+    Requests of the same recorded stream (connection) are replayed
+        through the same connection, preserving recorded timing, divided
+        by C{speed}. When there are fewer recorded streams than connections,
+        streams are replayed by several connections at once, multiplying
+        the load.
+
+    :param records: Records, ordered by send time.
+    :type records: list[aiobasex.recording.Record]
+    :param connect: A coroutine function, creating a connection.
+    :type connect: callable
+    :param speed: A speed-up factor.
+    :type speed: float
+    :param concurrency: A number of connections.
+    :type concurrency: int
+    :rtype: ReplayStats
+    """
+    assert speed > 0, 'speed must be positive.'
+    assert concurrency > 0, 'concurrency must be positive.'
+    loop = loop or asyncio.get_event_loop()
+    stats = ReplayStats()
+    if not records:
+        return stats
+
+    first = records[0].time
+    streams = sorted(set(record.stream for record in records))
+    if len(streams) >= concurrency:
+        assigned = [set(streams[i::concurrency]) for i in range(concurrency)]
+    else:
+        assigned = [{streams[i % len(streams)]} for i in range(concurrency)]
+
+    connections = []
+    try:
+        for _ in range(concurrency):
+            connections.append((yield from connect()))
+
+        started = loop.time()
+        yield from asyncio.gather(*[
+            _replay_streams(connection, [
+                record for record in records if record.stream in assigned[i]
+            ], first, speed, stats, loop)
+            for i, connection in enumerate(connections)
+        ], loop=loop)
+        stats.duration = loop.time() - started
+    finally:
+        for connection in connections:
+            yield from connection.close()
+
+    return stats
+
+
+class StandInServer:
+    """In-process stand-in for BaseX server.
+
+    Accepts any credentials, parses requests of Command Protocol and
+        Query Command Protocol, and answers them with responses of the
+        same layout, as BaseX does, carrying payload of configured size.
+    """
+
+    # A number of arguments of each protocol code.
+    _ARGS = {
+        0x00: 1, 0x02: 1, 0x03: 4, 0x04: 1, 0x05: 1, 0x06: 1, 0x07: 1,
+        0x08: 2, 0x09: 2, 0x0C: 2, 0x0D: 2, 0x0E: 3, 0x1E: 1, 0x1F: 1,
+    }
+
+    # Item type byte, prefixing items of RESULTS and FULL responses.
+    _ITEM_TYPE = b'\x20'
+
+    def __init__(self, *, response_size=64, service_time=0.0, loop=None):
+        """StandInServer ctor
+
+        :param response_size: A payload size of responses, in bytes.
+        :type response_size: int
+        :param service_time: Seconds to spend on each request.
+        :type service_time: float
+        :param loop: Asyncio`s event loop.
+        :type loop: asyncio.BaseEventLoop
+        """
+        self._payload = b'x' * response_size
+        self._service_time = service_time
+        self._loop = loop or asyncio.get_event_loop()
+        self._server = None
+        self._queries = 0
+
+    @asyncio.coroutine
+    def start(self, host='127.0.0.1', port=0):
+        """Start listening; return port.
+
+        :rtype: int
+        """
+        self._server = yield from asyncio.start_server(
+            self._handle, host, port, loop=self._loop)
+        return self._server.sockets[0].getsockname()[1]
+
+    @asyncio.coroutine
+    def close(self):
+        self._server.close()
+        yield from self._server.wait_closed()
+
+    @asyncio.coroutine
+    def _handle(self, reader, writer):
+        writer.write(b'BaseX:stand-in\x00')
+        yield from read_string(reader)
+        yield from read_string(reader)
+        writer.write(b'\x00')
+
+        try:
+            while True:
+                code = (yield from reader.readexactly(1))[0]
+                if code in self._ARGS:
+                    for _ in range(self._ARGS[code]):
+                        yield from read_string(reader)
+                else:
+                    yield from read_string(reader)
+                    code = None
+                if self._service_time:
+                    yield from asyncio.sleep(self._service_time,
+                                             loop=self._loop)
+                writer.write(self._respond(code))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _respond(self, code):
+        if code is None:
+            return self._payload + b'\x00info\x00\x00'
+        if code == 0x00:
+            self._queries += 1
+            return str(self._queries).encode() + b'\x00\x00'
+        if code in (0x02, 0x03, 0x0E):
+            return b'\x00\x00'
+        if code in (0x04, 0x1F):
+            return self._ITEM_TYPE + self._payload + b'\x00\x00\x00'
+        if code == 0x1E:
+            return b'false\x00\x00'
+        if code in (0x05, 0x06, 0x07):
+            return self._payload + b'\x00\x00'
+        return b'info\x00\x00'
+
+
+@asyncio.coroutine
+def _main(args, loop):
+    records = read_records(args.log)
+
+    server = None
+    host, port = args.host, args.port
+    if args.stand_in:
+        server = StandInServer(response_size=args.response_size,
+                               service_time=args.service_time, loop=loop)
+        host, port = '127.0.0.1', (yield from server.start())
+
+    def connect():
+        return create_connection(host, port, username=args.username,
+                                 password=args.password, loop=loop)
+
+    try:
+        return (yield from replay(records, connect, speed=args.speed,
+                                  concurrency=args.concurrency, loop=loop))
+    finally:
+        if server is not None:
+            yield from server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m aiobasex.replay',
+        description='Replay traffic, recorded by aiobasex, and report '
+                    'throughput, latencies and errors.')
+    parser.add_argument('log', help='traffic log file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1984)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='speed-up factor, e.g. 5 for 5x')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='number of connections')
+    parser.add_argument('--stand-in', action='store_true',
+                        help='replay against in-process stand-in server')
+    parser.add_argument('--response-size', type=int, default=64,
+                        help='payload size of stand-in responses, bytes')
+    parser.add_argument('--service-time', type=float, default=0.0,
+                        help='seconds, stand-in spends on each request')
+    args = parser.parse_args(argv)
+
+    loop = asyncio.get_event_loop()
+    stats = loop.run_until_complete(_main(args, loop))
+    print(stats.report())
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
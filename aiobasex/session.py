@@ -1,8 +1,8 @@
 import asyncio
 import logging
 
-from aiobasex import errors, query
-from aiobasex.utils import communicate_with_server, string_args_to_bytes
+from aiobasex import cursor, errors, query
+from aiobasex.utils import communicate_with_server
 
 
 logger = logging.getLogger(__name__)
@@ -17,9 +17,22 @@ class BaseXSession:
     _REPLACE = b'\x0C'
     _STORE = b'\x0D'
 
-    def __init__(self, connection):
+    def __init__(self, connection, *, profiler=None, lazy_close=False):
+        """BaseXSession ctor
+
+        :param connection: A connection to BaseX server.
+        :type connection: aiobasex.connection.BaseXConnection
+        :param profiler: An optional profiler, to which queries, registered
+            with this session, report their executions.
+        :type profiler: aiobasex.profiling.QueryProfiler
+        :param lazy_close: Whether queries, registered with this session,
+            defer their CLOSE requests, see C{BaseXQuery}.
+        :type lazy_close: bool
+        """
         self._connection = connection
         self._loop = connection.loop
+        self._profiler = profiler
+        self._lazy_close = lazy_close
 
     def __enter__(self):
         return self
@@ -27,81 +40,154 @@ class BaseXSession:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self._loop.create_task(self._connection.close())
 
-    @string_args_to_bytes(1)
     @asyncio.coroutine
     def command(self, c):
         """Invokes BaseX command, and returns results.
 
         :param c: A command to execute.
-        :type c: bytes
+        :type c: str|bytes
         """
 
         result_waiter = asyncio.Future(loop=self._loop)
         info_waiter = asyncio.Future(loop=self._loop)
 
         self._connection.send_msg(
-            c + self._connection.SUCCESS_TERM,
-            waiter=[result_waiter, info_waiter])
+            self._connection.frame(b'', c),
+            waiter=[result_waiter, info_waiter],
+            success_term_twice=True, error_follows=False)
 
         r_err, r_msg = yield from result_waiter
-        if r_err:
-            raise errors.CommandError('Info: {!s}'.format(r_msg))
         i_err, i_msg = yield from info_waiter
+        if r_err or i_err:
+            raise errors.CommandError('Info: {!s}'.format(i_msg))
 
         logger.info(i_msg)
 
         return r_msg
 
-    def _communicate(self, to_send):
-        return communicate_with_server(self._connection,
-                                       to_send, loop=self._loop)
+    @property
+    def events(self):
+        """An asynchronous iterator over events, watched without callback.
+
+        :rtype: aiobasex.events.BaseXEventChannel
+        """
+        return self._connection.events
 
-    @string_args_to_bytes(1)
     @asyncio.coroutine
+    def watch(self, name, callback=None):
+        """Subscribes to server event.
+
+        :param name: A name of event.
+        :type name: str|bytes
+        :param callback: A callable, invoked with C{aiobasex.events.Event}
+            on each notification. If omitted, events are delivered to
+            C{events} iterator.
+        :type callback: callable
+        """
+        yield from self._connection.events.watch(name, callback)
+
+    @asyncio.coroutine
+    def unwatch(self, name):
+        """Unsubscribes from server event.
+
+        :param name: A name of event.
+        :type name: str|bytes
+        """
+        yield from self._connection.events.unwatch(name)
+
+    def _communicate(self, to_send, success_term_twice=False,
+                     error_follows=True):
+        return communicate_with_server(self._connection,
+                                       to_send, loop=self._loop,
+                                       success_term_twice=success_term_twice,
+                                       error_follows=error_follows)
+
     def query(self, q):
-        """Creates C{BaseXQuery}"""
+        """Creates C{BaseXQuery}.
+
+        Result may be awaited, or used as asynchronous context manager,
+            closing the query on exit.
+
+        :param q: A query.
+        :type q: str|bytes
+        :rtype: aiobasex.query.QueryContextManager
+        """
+        return query.QueryContextManager(self._query(q))
+
+    @asyncio.coroutine
+    def _query(self, q):
         error, _ = yield from self._communicate(
-            self._QUERY + q + self._connection.SUCCESS_TERM)
+            self._connection.frame(self._QUERY, q),
+            success_term_twice=True)
         if error:
             raise errors.QueryError(_)
         else:
-            return query.BaseXQuery(self._connection, _)
+            return query.BaseXQuery(
+                self._connection, _,
+                query=q if isinstance(q, str) else
+                q.decode(self._connection.encoding, 'replace'),
+                profiler=self._profiler, lazy_close=self._lazy_close,
+                close_on_gc=True)
 
-    @string_args_to_bytes(1, 2)
     @asyncio.coroutine
-    def create(self, d, i=b''):
+    def cursor(self, q, *, wrap=True, offset_var='offset', limit_var='limit',
+               **kwargs):
+        """Creates C{BaseXCursor}, paging through query results.
+
+        :param q: A query. If C{wrap} is false, it must declare and use
+            offset and limit external variables itself.
+        :type q: str|bytes
+        :param wrap: Whether to wrap query body with C{subsequence()}.
+        :type wrap: bool
+        :param offset_var: A name of 1-based offset variable.
+        :type offset_var: str
+        :param limit_var: A name of page size variable.
+        :type limit_var: str
+        :param kwargs: Other arguments of C{BaseXCursor}.
+        """
+        if wrap:
+            if isinstance(q, bytes):
+                q = q.decode(self._connection.encoding)
+            q = cursor.window_query(q, offset_var=offset_var,
+                                    limit_var=limit_var)
+        registered = yield from self.query(q)
+        return cursor.BaseXCursor(
+            registered, offset_var=offset_var, limit_var=limit_var,
+            close_query=True, **kwargs)
+
+    @asyncio.coroutine
+    def create(self, d, i=''):
         """Creates a database.
 
         :param d: A name of database to create.
-        :type d: bytes
+        :type d: str|bytes
         :param i: An input for database
-        :type i: bytes
+        :type i: str|bytes
         :raises errors.CannotCreateDatabase: When failes to create DB.
         """
         error, _ = yield from self._communicate(
-            self._CREATE + d + self._connection.SUCCESS_TERM +
-            i + self._connection.SUCCESS_TERM,
+            self._connection.frame(self._CREATE, d, i),
+            success_term_twice=True, error_follows=False,
         )
         if error:
             raise errors.CannotCreateDatabase(_)
         else:
             logger.info(_)
 
-    @string_args_to_bytes(1, 2, 3)
     @asyncio.coroutine
     def add(self, p, i):
         """Creates a resource in given database at given path.
 
         :param d: A database name.
-        :type d: bytes
+        :type d: str|bytes
         :param p: A path, where to store data.
-        :type p: bytes
+        :type p: str|bytes
         :param i: A document body.
-        :type i: bytes
+        :type i: str|bytes
         """
         error, _ = yield from self._communicate(
-            self._ADD + p +
-            self._connection.SUCCESS_TERM + i + self._connection.SUCCESS_TERM,
+            self._connection.frame(self._ADD, p, i),
+            success_term_twice=True, error_follows=False,
         )
 
         if error:
@@ -109,19 +195,18 @@ class BaseXSession:
         else:
             logger.info(_)
 
-    @string_args_to_bytes(1, 2)
     @asyncio.coroutine
     def replace(self, p, i):
         """Replaces a resource at given path with given input document.
 
         :param p: A path to resource.
-        :type p: bytes
+        :type p: str|bytes
         :param i: An input document to replace.
-        :type i: bytes
+        :type i: str|bytes
         """
         error, _ = yield from self._communicate(
-            self._REPLACE + p + self._connection.SUCCESS_TERM +
-            i + self._connection.SUCCESS_TERM,
+            self._connection.frame(self._REPLACE, p, i),
+            success_term_twice=True, error_follows=False,
         )
 
         if error:
@@ -129,20 +214,18 @@ class BaseXSession:
         else:
             logger.info(_)
 
-    @string_args_to_bytes(1, 2)
     @asyncio.coroutine
     def store(self, p, i):
         """Stores a BLOB in BaseX.
 
         :param p: A path, where to store BLOB.
-        :type p: bytes
+        :type p: str|bytes
         :param i: An input blob.
-        :type i: bytes
+        :type i: str|bytes
         """
-        error, _ = yield from self._communicate(self._STORE + p +
-                                                self._connection.SUCCESS_TERM +
-                                                i +
-                                                self._connection.SUCCESS_TERM)
+        error, _ = yield from self._communicate(
+            self._connection.frame(self._STORE, p, i),
+            success_term_twice=True, error_follows=False)
 
         if error:
             raise errors.CannotReplaceResource(_)
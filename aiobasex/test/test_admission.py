@@ -0,0 +1,166 @@
+import asyncio
+import unittest
+
+import asynctest
+
+from aiobasex import errors
+from aiobasex.admission import AdmissionControl
+from aiobasex.connection import create_connection
+from aiobasex.replay import StandInServer
+from aiobasex.session import BaseXSession
+from aiobasex.test.utils import FailingServer
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdmissionControlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+
+    def test_max_queue_depth(self):
+        admission = AdmissionControl(max_queue_depth=2, clock=self.clock)
+        started = admission.admit()
+        admission.admit()
+
+        with self.assertRaises(errors.RequestRejected):
+            admission.admit()
+
+        admission.release(started, AdmissionControl.SUCCESS)
+        admission.admit()
+        self.assertEqual(admission.in_flight, 2)
+
+    def test_max_queue_wait(self):
+        admission = AdmissionControl(max_queue_wait=1.0, clock=self.clock)
+        started = admission.admit()
+        self.clock.now = 0.5
+        admission.release(started, AdmissionControl.SUCCESS)
+        self.assertEqual(admission.service_time, 0.5)
+
+        admission.admit()
+        admission.admit()
+        admission.admit()
+        self.assertEqual(admission.estimated_wait, 1.5)
+
+        with self.assertRaises(errors.RequestRejected):
+            admission.admit()
+
+    def test_circuit_breaker(self):
+        admission = AdmissionControl(failure_threshold=2, reset_timeout=10,
+                                     clock=self.clock)
+        for _ in range(2):
+            admission.release(admission.admit(), AdmissionControl.TIMEOUT)
+
+        self.assertEqual(admission.state, AdmissionControl.OPEN)
+        with self.assertRaises(errors.CircuitOpen):
+            admission.admit()
+
+        self.clock.now = 10
+        self.assertEqual(admission.state, AdmissionControl.HALF_OPEN)
+        probe = admission.admit()
+        with self.assertRaises(errors.CircuitOpen):
+            admission.admit()
+
+        admission.release(probe, AdmissionControl.FAILURE)
+        self.assertEqual(admission.state, AdmissionControl.OPEN)
+
+        self.clock.now = 20
+        admission.release(admission.admit(), AdmissionControl.SUCCESS)
+        self.assertEqual(admission.state, AdmissionControl.CLOSED)
+
+
+class ConnectionAdmissionTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    async def setUp(self):
+        self.server = FailingServer(loop=self.loop)
+        port = await self.server.start()
+        self.admission = AdmissionControl(failure_threshold=2,
+                                          reset_timeout=60)
+        self.connection = await create_connection(
+            '127.0.0.1', port, username='admin', password='admin',
+            admission=self.admission, loop=self.loop)
+
+    async def tearDown(self):
+        await self.connection.close()
+        await self.server.close()
+
+    async def test_failing_commands_open_circuit(self):
+        session = BaseXSession(self.connection)
+        for _ in range(2):
+            with self.assertRaises(errors.CommandError):
+                await session.command('INFO')
+
+        self.assertEqual(self.admission.in_flight, 0)
+        self.assertEqual(self.admission.state, AdmissionControl.OPEN)
+        with self.assertRaises(errors.CircuitOpen):
+            await session.command('INFO')
+
+    async def test_request_admitted_once(self):
+        session = BaseXSession(self.connection)
+        q = await session.query('1')
+        self.assertEqual(self.admission.in_flight, 0)
+        self.assertEqual(await q.execute(), 'x' * 64)
+        self.assertEqual(self.admission.state, AdmissionControl.CLOSED)
+
+
+class ConnectionTimeoutTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    # Seconds, server spends on each request.
+    service_time = 0.2
+
+    async def setUp(self):
+        self.server = StandInServer(service_time=self.service_time,
+                                    loop=self.loop)
+        port = await self.server.start()
+        self.admission = AdmissionControl(failure_threshold=2,
+                                          reset_timeout=60)
+        self.connection = await create_connection(
+            '127.0.0.1', port, username='admin', password='admin',
+            admission=self.admission, loop=self.loop)
+        self.session = BaseXSession(self.connection)
+
+    async def tearDown(self):
+        await self.connection.close()
+        await self.server.close()
+
+    async def _time_out_commands(self):
+        for _ in range(2):
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(self.session.command('INFO'), 0.05,
+                                       loop=self.loop)
+        await asyncio.sleep(0, loop=self.loop)
+
+    async def test_timed_out_commands_open_circuit(self):
+        await self._time_out_commands()
+
+        self.assertEqual(self.admission.state, AdmissionControl.OPEN)
+        self.assertEqual(self.admission.in_flight, 2)
+
+        # Late responses release requests, without recording outcome twice.
+        await asyncio.sleep(2 * self.service_time, loop=self.loop)
+        self.assertEqual(self.admission.in_flight, 0)
+        self.assertEqual(self.admission.state, AdmissionControl.OPEN)
+
+
+class HungServerTimeoutTest(ConnectionTimeoutTest):
+
+    service_time = 60
+
+    async def test_timed_out_commands_open_circuit(self):
+        await self._time_out_commands()
+
+        self.assertEqual(self.admission.state, AdmissionControl.OPEN)
+        self.assertEqual(self.admission.in_flight, 2)
+        with self.assertRaises(errors.CircuitOpen):
+            await self.session.command('INFO')
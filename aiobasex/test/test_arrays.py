@@ -0,0 +1,38 @@
+import array
+import unittest
+
+from aiobasex.arrays import to_array, to_columns
+
+
+class ToArrayTest(unittest.TestCase):
+
+    def test_infer_integers(self):
+        values = to_array([b'1', b'-2', b'3'])
+        self.assertEqual(values, array.array('q', [1, -2, 3]))
+
+    def test_infer_doubles(self):
+        values = to_array([b'1', b'2.5', b'-1E3', b'INF'])
+        self.assertEqual(values, array.array(
+            'd', [1.0, 2.5, -1000.0, float('inf')]))
+
+    def test_typecode(self):
+        self.assertEqual(to_array([b'1.5'], 'f'), array.array('f', [1.5]))
+        self.assertEqual(to_array([b'7'], 'i'), array.array('i', [7]))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            to_array([b'1.5'], 'q')
+        with self.assertRaises(ValueError):
+            to_array([b'true'])
+
+
+class ToColumnsTest(unittest.TestCase):
+
+    def test_columns(self):
+        ids, prices = to_columns([b'1', b'9.5', b'2', b'7'], ['i', 'd'])
+        self.assertEqual(ids, array.array('i', [1, 2]))
+        self.assertEqual(prices, array.array('d', [9.5, 7.0]))
+
+    def test_incomplete_rows(self):
+        with self.assertRaises(ValueError):
+            to_columns([b'1', b'2', b'3'], ['i', 'd'])
@@ -0,0 +1,76 @@
+import asyncio
+
+import asynctest
+
+from aiobasex.connection import create_connection
+from aiobasex.session import BaseXSession
+
+
+class BaseXEventsTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    async def setUp(self):
+        self._watcher = await create_connection(
+            'basex.docker',
+            username='admin',
+            password='admin',
+            loop=self.loop,
+        )
+        self._notifier = await create_connection(
+            'basex.docker',
+            username='admin',
+            password='admin',
+            loop=self.loop,
+        )
+        self.watcher = BaseXSession(connection=self._watcher)
+        self.notifier = BaseXSession(connection=self._notifier)
+        await self.notifier.command('CREATE EVENT test_event')
+
+    async def tearDown(self):
+        await self.notifier.command('DROP EVENT test_event')
+        await self._watcher.close()
+        await self._notifier.close()
+
+    async def _notify(self, data):
+        q = await self.notifier.query(
+            "db:event('test_event', '{}')".format(data))
+        await q.execute()
+        await q.close()
+
+    async def test_watch_iterator(self):
+        await self.watcher.watch('test_event')
+        await self._notify('foo')
+
+        event = await asyncio.wait_for(
+            self.watcher.events.__anext__(), 5, loop=self.loop)
+        self.assertEqual(event.name, 'test_event')
+        self.assertEqual(event.data, 'foo')
+
+        await self.watcher.unwatch('test_event')
+        self.assertEqual(self.watcher.events.watched, frozenset())
+
+    async def test_watch_callback(self):
+        received = asyncio.Future(loop=self.loop)
+        await self.watcher.watch('test_event', received.set_result)
+        await self._notify('bar')
+
+        event = await asyncio.wait_for(received, 5, loop=self.loop)
+        self.assertEqual(event.data, 'bar')
+
+        # Request-response stream is not affected by notifications.
+        result = await self.watcher.command('XQUERY 1 + 1')
+        self.assertEqual(result, '2')
+
+    async def test_watch_bytes_name(self):
+        received = asyncio.Future(loop=self.loop)
+        await self.watcher.watch(b'test_event', received.set_result)
+        self.assertEqual(self.watcher.events.watched,
+                         frozenset(['test_event']))
+        await self._notify('baz')
+
+        event = await asyncio.wait_for(received, 5, loop=self.loop)
+        self.assertEqual(event, ('test_event', 'baz'))
+
+        await self.watcher.unwatch(b'test_event')
+        self.assertEqual(self.watcher.events.watched, frozenset())
@@ -1,3 +1,5 @@
+import array
+
 import asynctest
 
 from aiobasex.connection import create_connection
@@ -130,3 +132,78 @@ class BaseXConnectionTest(asynctest.TestCase):
         results = await q2.updating()
 
         self.assertTrue(results)
+
+    async def test_query_info(self):
+        q1 = await self.session.query(
+            'for $i in (1 to 3) return <a> { $i } </a>')
+        await q1.execute()
+
+        info = await q1.info()
+
+        self.assertIn('total time', info.timings)
+        self.assertEqual(info.counters.get('hit(s)'), 3)
+        await q1.close()
+
+    async def test_query_execute_many(self):
+        q1 = await self.session.query('''
+            declare variable $a external;
+            declare variable $b external;
+            $a || '-' || $b
+        ''')
+        results = await q1.execute_many(
+            {'a': str(i), 'b': ('x', 'xs:string')} for i in range(5))
+
+        self.assertEqual(results, ['0-x', '1-x', '2-x', '3-x', '4-x'])
+        await q1.close()
+
+    async def test_query_cursor(self):
+        cursor = await self.session.cursor(
+            'for $i in (1 to 10) return <a>{ $i }</a>',
+            page_size=4, prefetch=2)
+
+        pages = []
+        async for page in cursor:
+            pages.append(page)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[-1], '<a>9</a>\n<a>10</a>')
+
+    async def test_query_context_manager(self):
+        async with self.session.query('1 + 1') as q1:
+            self.assertEqual(await q1.execute(), '2')
+
+        self.assertTrue(q1.closed)
+
+    async def test_query_lazy_close(self):
+        session = BaseXSession(self._connection, lazy_close=True)
+        for i in range(3):
+            async with session.query(str(i)) as q1:
+                self.assertEqual(await q1.execute(), str(i))
+            self.assertTrue(q1.closed)
+
+        # Deferred CLOSE requests are sent along with this one.
+        self.assertEqual(await self.session.command('XQUERY 1'), '1')
+        self.assertFalse(self._connection._deferred)
+
+    async def test_query_results_array(self):
+        q1 = await self.session.query('(1 to 5) ! (. * 1.5)')
+        self.assertEqual(await q1.results_array('d'),
+                         array.array('d', [1.5, 3.0, 4.5, 6.0, 7.5]))
+        await q1.close()
+
+        q2 = await self.session.query('(1 to 3) ! (., . div 2)')
+        numbers, halves = await q2.results_columns(['q', 'd'])
+        self.assertEqual(numbers, array.array('q', [1, 2, 3]))
+        self.assertEqual(halves, array.array('d', [0.5, 1.0, 1.5]))
+        await q2.close()
+
+    async def test_query_cursor_break(self):
+        async with await self.session.cursor(
+                'for $i in (1 to 10) return <a>{ $i }</a>',
+                page_size=2) as cursor:
+            async for page in cursor:
+                break
+
+        self.assertEqual(page, '<a>1</a>\n<a>2</a>')
+        self.assertTrue(cursor._exhausted)
+        self.assertEqual(await self.session.command('XQUERY 1'), '1')
@@ -1,7 +1,10 @@
+import asyncio
+
 import asynctest
 
 from aiobasex.connection import create_connection
 from aiobasex.errors import CannotAuthenticate
+from aiobasex.health import KeepAlive
 
 
 class CreateConnectionTest(asynctest.TestCase):
@@ -36,3 +39,22 @@ class CreateConnectionTest(asynctest.TestCase):
 
         self.assertEqual(repr(conn), '<BaseXConnection: basex.docker:1984>')
         self.assertTrue(conn.authenticated)
+
+    async def test_create_connection_keepalive(self):
+
+        conn = await create_connection(
+            'basex.docker',
+            username='admin',
+            password='admin',
+            keepalive=KeepAlive(interval=0.05),
+            loop=self.loop
+        )
+
+        await asyncio.sleep(0.2, loop=self.loop)
+        self.assertGreater(conn.latency.count, 0)
+        self.assertTrue(conn.healthy)
+
+        self.assertIsNotNone(await conn.probe())
+
+        await conn.close()
+        self.assertFalse(conn.healthy)
@@ -0,0 +1,34 @@
+import unittest
+
+from aiobasex.cursor import BaseXCursor
+
+
+class Connection:
+    loop = None
+    encoding = 'utf-8'
+
+
+class Query:
+    connection = Connection()
+
+
+class CursorAdaptTest(unittest.TestCase):
+
+    def test_adapt_to_page_bytes(self):
+        cursor = BaseXCursor(Query(), page_size=10, target_page_bytes=1000)
+        cursor._adapt(10, 'a' * 100)
+        self.assertEqual(cursor.page_size, 100)
+
+    def test_adapt_to_encoded_page_bytes(self):
+        cursor = BaseXCursor(Query(), page_size=10, target_page_bytes=1000)
+        # 100 characters, taking 200 bytes in UTF-8.
+        cursor._adapt(10, 'é' * 100)
+        self.assertEqual(cursor.page_size, 50)
+
+    def test_adapt_within_bounds(self):
+        cursor = BaseXCursor(Query(), page_size=10, target_page_bytes=1000,
+                             min_page_size=20, max_page_size=30)
+        cursor._adapt(10, 'é' * 1000)
+        self.assertEqual(cursor.page_size, 20)
+        cursor._adapt(10, 'a')
+        self.assertEqual(cursor.page_size, 30)
@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+
+import asynctest
+
+from aiobasex import errors
+from aiobasex.admission import AdmissionControl
+from aiobasex.connection import create_connection
+from aiobasex.health import KeepAlive, LatencyStats
+from aiobasex.replay import StandInServer
+from aiobasex.session import BaseXSession
+from aiobasex.test.utils import FailingServer
+
+
+class LatencyStatsTest(unittest.TestCase):
+
+    def test_ewma(self):
+        stats = LatencyStats(smoothing=0.5)
+        self.assertIsNone(stats.ewma)
+
+        stats.add(0.002)
+        self.assertEqual(stats.ewma, 0.002)
+        stats.add(0.004)
+        self.assertAlmostEqual(stats.ewma, 0.003)
+        self.assertEqual(stats.last, 0.004)
+        self.assertEqual(stats.count, 2)
+
+    def test_histogram(self):
+        stats = LatencyStats()
+        for latency in (0.0001, 0.0002, 0.003, 10.0):
+            stats.add(latency)
+
+        histogram = dict(stats.histogram())
+        self.assertEqual(histogram[0.125], 1)
+        self.assertEqual(histogram[0.25], 1)
+        self.assertEqual(histogram[4.0], 1)
+        self.assertEqual(histogram[None], 1)
+        self.assertEqual(sum(histogram.values()), 4)
+
+
+class KeepAliveTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    async def setUp(self):
+        self.server = StandInServer(service_time=0.4, loop=self.loop)
+        port = await self.server.start()
+        self.connection = await create_connection(
+            '127.0.0.1', port, username='admin', password='admin',
+            keepalive=KeepAlive(interval=0.05, timeout=0.5),
+            loop=self.loop)
+
+    async def tearDown(self):
+        await self.connection.close()
+        await self.server.close()
+
+    async def test_no_probes_behind_slow_request(self):
+        session = BaseXSession(self.connection)
+        await session.command('INFO')
+        # Long enough for a probe, queued behind the command, to time out.
+        await asyncio.sleep(0.3, loop=self.loop)
+
+        self.assertTrue(self.connection.healthy)
+        self.assertEqual(self.connection._probe_failures, 0)
+
+    async def test_probe_idle_connection(self):
+        await asyncio.sleep(0.7, loop=self.loop)
+
+        self.assertTrue(self.connection.healthy)
+        self.assertGreater(self.connection.latency.count, 0)
+
+
+class KeepAliveAdmissionTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    async def setUp(self):
+        self.server = FailingServer(loop=self.loop)
+        port = await self.server.start()
+        self.connection = await create_connection(
+            '127.0.0.1', port, username='admin', password='admin',
+            admission=AdmissionControl(failure_threshold=1, reset_timeout=2),
+            keepalive=KeepAlive(interval=0.05), loop=self.loop)
+
+    async def tearDown(self):
+        await self.connection.close()
+        await self.server.close()
+
+    async def test_rejected_probes_yield_to_loop(self):
+        with self.assertRaises(errors.CommandError):
+            await BaseXSession(self.connection).command('INFO')
+
+        # Circuit breaker is open, so probes are rejected.
+        started = self.loop.time()
+        await asyncio.sleep(0.1, loop=self.loop)
+        self.assertLess(self.loop.time() - started, 0.5)
@@ -0,0 +1,88 @@
+import unittest
+
+from aiobasex.profiling import QueryInfo, QueryProfiler
+
+
+INFO = '''
+Query:
+for $i in (1 to 3) return <a> { $i } </a>
+Compiling:
+- pre-evaluate range expression to range sequence: (1 to 3)
+Optimized Query:
+for $i in (1 to 3) return <a>{ $i }</a>
+Parsing: 0.26 ms
+Compiling: 0.12 ms
+Evaluating: 0.05 ms
+Printing: 0.31 ms
+Total Time: 0.74 ms
+
+Hit(s): 3 Items
+Updated: 0 Items
+Printed: 39 b
+Read Locking: (none)
+Write Locking: (none)
+
+Query executed in 0.74 ms.
+'''
+
+
+class QueryInfoTest(unittest.TestCase):
+
+    def test_parse_timings(self):
+        info = QueryInfo(INFO)
+        self.assertEqual(info.timings, {
+            'parsing': 0.26,
+            'compiling': 0.12,
+            'evaluating': 0.05,
+            'printing': 0.31,
+            'total time': 0.74,
+        })
+        self.assertEqual(info.total, 0.74)
+
+    def test_parse_counters(self):
+        info = QueryInfo(INFO)
+        self.assertEqual(info.counters,
+                         {'hit(s)': 3, 'updated': 0, 'printed': 39})
+        self.assertEqual(info.locking,
+                         {'read locking': '(none)',
+                          'write locking': '(none)'})
+
+    def test_parse_sections(self):
+        info = QueryInfo(INFO)
+        self.assertEqual(info.query,
+                         'for $i in (1 to 3) return <a> { $i } </a>')
+        self.assertEqual(info.optimized_query,
+                         'for $i in (1 to 3) return <a>{ $i }</a>')
+        self.assertTrue(info.compiling.startswith('- pre-evaluate'))
+        self.assertIsNone(info.plan)
+
+
+class QueryProfilerTest(unittest.TestCase):
+
+    def test_slow_queries(self):
+        profiler = QueryProfiler()
+        profiler.record('a', 10.0)
+        profiler.record('a', 10.0)
+        profiler.record('b', 15.0, QueryInfo(INFO))
+
+        by_total = profiler.slow_queries(key='total')
+        self.assertEqual([s.query for s in by_total], ['a', 'b'])
+        self.assertEqual(by_total[0].count, 2)
+
+        by_mean = profiler.slow_queries(1, key='mean')
+        self.assertEqual([s.query for s in by_mean], ['b'])
+        self.assertEqual(by_mean[0].server_mean, 0.74)
+
+    def test_server_mean_without_info(self):
+        profiler = QueryProfiler()
+        profiler.record('a', 10.0, QueryInfo(INFO))
+        profiler.record('a', 10.0)
+
+        stats, = profiler.slow_queries()
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.server_count, 1)
+        self.assertEqual(stats.server_mean, 0.74)
+
+    def test_sample_rate(self):
+        self.assertFalse(QueryProfiler(0).should_sample())
+        self.assertTrue(QueryProfiler(1).should_sample())
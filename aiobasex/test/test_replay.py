@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import asynctest
+
+from aiobasex.connection import create_connection
+from aiobasex.recording import TrafficRecorder, read_records
+from aiobasex.replay import ReplayStats, StandInServer, replay
+from aiobasex.session import BaseXSession
+
+
+class ReplayTest(asynctest.TestCase):
+
+    use_default_loop = True
+
+    async def setUp(self):
+        self.server = StandInServer(response_size=16, loop=self.loop)
+        self.port = await self.server.start()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    async def tearDown(self):
+        await self.server.close()
+        os.remove(self.path)
+
+    def _connect(self):
+        return create_connection('127.0.0.1', self.port, username='admin',
+                                 password='admin', loop=self.loop)
+
+    async def _record(self):
+        recorder = TrafficRecorder(self.path)
+        connection = await self._connect()
+        connection.start_recording(recorder)
+        session = BaseXSession(connection)
+
+        q = await session.query('declare variable $a external; $a')
+        await q.bind('a', 'b')
+        await q.execute()
+        await session.command('INFO')
+        await q.close()
+
+        await connection.close()
+        recorder.close()
+
+    async def test_record(self):
+        await self._record()
+
+        records = read_records(self.path)
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0].frame,
+                         b'\x00declare variable $a external; $a\x00')
+        self.assertEqual(records[0].result, b'1')
+        self.assertEqual(records[2].response_size, 16)
+        self.assertEqual(records[3].waiters, 2)
+        self.assertFalse(any(record.error for record in records))
+
+    async def test_replay(self):
+        await self._record()
+
+        stats = await replay(read_records(self.path), self._connect,
+                             speed=10, concurrency=3, loop=self.loop)
+
+        self.assertEqual(stats.requests, 15)
+        self.assertEqual(stats.errors, 0)
+        self.assertEqual(sum(count for _, count in stats.histogram()), 15)
+
+
+class ReplayStatsTest(unittest.TestCase):
+
+    def test_report(self):
+        stats = ReplayStats()
+        stats.add(0.001, False)
+        stats.add(0.003, True)
+        stats.duration = 2.0
+
+        self.assertEqual(stats.throughput, 1.0)
+        self.assertEqual(stats.error_rate, 0.5)
+        self.assertEqual(stats.percentile(100), 3.0)
+        self.assertIn('errors: 1 (50.00%)', stats.report())
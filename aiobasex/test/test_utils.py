@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+
+import asynctest
+
+from aiobasex.utils import (build_frame, escape, item_tokens, read_items,
+                            read_string, split_items, unescape, write_frame)
+
+
+class EscapeTest(unittest.TestCase):
+
+    def test_escape_not_needed(self):
+        data = b'<xml/>'
+        self.assertIs(escape(data, 'utf-8'), data)
+
+    def test_escape_special_bytes(self):
+        self.assertEqual(escape(b'a\x00b\xffc', 'utf-8'),
+                         b'a\xff\x00b\xff\xffc')
+        self.assertEqual(escape(memoryview(b'\x00'), 'utf-8'), b'\xff\x00')
+
+    def test_escape_encoding(self):
+        self.assertEqual(escape('ÿ', 'latin-1'), b'\xff\xff')
+        self.assertEqual(escape('ü', 'utf-8'), b'\xc3\xbc')
+        self.assertEqual(escape(8, 'utf-8'), b'8')
+
+
+class BuildFrameTest(unittest.TestCase):
+
+    def test_build_frame(self):
+        frame = build_frame(b'\x03', b'0', 'var', 'value', '',
+                            encoding='utf-8')
+        self.assertEqual(b''.join(frame), b'\x030\x00var\x00value\x00\x00')
+
+    def test_build_command_frame(self):
+        frame = build_frame(b'', 'INFO', encoding='utf-8')
+        self.assertEqual(frame, [b'INFO', b'\x00'])
+
+
+class WriteFrameTest(unittest.TestCase):
+
+    class Writer:
+
+        def __init__(self):
+            self.writes = []
+
+        def write(self, data):
+            self.writes.append(data)
+
+    def test_write_small_frame(self):
+        writer = self.Writer()
+        write_frame(writer, build_frame(b'\x03', b'0', 'var', 'value', '',
+                                        encoding='utf-8'))
+        self.assertEqual(writer.writes, [b'\x030\x00var\x00value\x00\x00'])
+
+    def test_write_large_buffer_as_is(self):
+        value = b'x' * (1024 * 1024)
+        writer = self.Writer()
+        write_frame(writer, build_frame(b'\x03', b'0', 'var', value, '',
+                                        encoding='utf-8'))
+        self.assertEqual(writer.writes,
+                         [b'\x030\x00var\x00', value, b'\x00\x00'])
+        self.assertIs(writer.writes[1], value)
+
+
+class SplitItemsTest(unittest.TestCase):
+
+    def test_split_items(self):
+        self.assertEqual(split_items(b'\x52a\x00\x52\x00'), [b'a', b''])
+        self.assertEqual(split_items(b'\x52a\xff\x00\x00\x52\xff\xff\x00'),
+                         [b'a\x00', b'\xff'])
+
+    def test_item_tokens(self):
+        self.assertEqual(item_tokens(b'\x521\x00\x53-2.5E3\x00\x52INF\x00'),
+                         [b'1', b'-2.5E3', b'INF'])
+        self.assertEqual(item_tokens(b''), [])
+
+
+class ReadStringTest(asynctest.TestCase):
+
+    async def test_read_string(self):
+        reader = asyncio.StreamReader(loop=self.loop)
+        reader.feed_data(b'a\xff\x00b\xff\xff\x00tail\x00')
+
+        self.assertEqual(await read_string(reader), b'a\x00b\xff')
+        self.assertEqual(await read_string(reader), b'tail')
+
+    async def test_read_long_string(self):
+        reader = asyncio.StreamReader(limit=16, loop=self.loop)
+        reader.feed_data(b'x' * 100 + b'\x00')
+
+        self.assertEqual(await read_string(reader), b'x' * 100)
+
+    def test_unescape(self):
+        self.assertEqual(unescape(b'\xff\xff\xff\x00'), b'\xff\x00')
+
+
+class ReadItemsTest(asynctest.TestCase):
+
+    async def test_read_items(self):
+        reader = asyncio.StreamReader(loop=self.loop)
+        reader.feed_data(b'\x52a\x00\x52b\x00\x00\x00')
+
+        self.assertEqual(await read_items(reader), b'\x52a\x00\x52b\x00')
+        self.assertEqual(await reader.readexactly(1), b'\x00')
+
+    async def test_read_no_items(self):
+        reader = asyncio.StreamReader(loop=self.loop)
+        reader.feed_data(b'\x00\x01error\x00')
+
+        self.assertEqual(await read_items(reader), b'')
+        self.assertEqual(await reader.readexactly(1), b'\x01')
+
+    async def test_read_escaped_items(self):
+        reader = asyncio.StreamReader(limit=16, loop=self.loop)
+        reader.feed_data(b'\x52' + b'x' * 100 + b'\xff\x00\x00\x00\x00')
+
+        self.assertEqual(await read_items(reader),
+                         b'\x52' + b'x' * 100 + b'\xff\x00\x00')
+        self.assertEqual(await reader.readexactly(1), b'\x00')
@@ -1,6 +1,17 @@
 from xml.dom import minidom
 from xml.dom.minidom import Node
 
+from aiobasex.replay import StandInServer
+
+
+class FailingServer(StandInServer):
+    """Stand-in server, failing every command."""
+
+    def _respond(self, code):
+        if code is None:
+            return b'\x00bad command\x00\x01'
+        return super()._respond(code)
+
 
 def remove_blanks(node):
     for x in node.childNodes:
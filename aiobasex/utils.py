@@ -1,42 +1,225 @@
 import asyncio
-import functools
+import re
 
 
-def string_args_to_bytes(*arg_positions):
-    """Convert positional arguments to bytes, in case if string is passed.
+# Bytes, which must be prefixed with \xFF, when sent to BaseX server.
+_ESCAPE_RE = re.compile(b'[\x00\xFF]')
 
-    Since BaseX write protocol works only with bytes, it is necessary
-        to be able passing strings to API.
+# Escaped bytes, received from BaseX server.
+_UNESCAPE_RE = re.compile(b'\xFF(.)', re.DOTALL)
+
+# Terminates every argument of request frame.
+_TERM = b'\x00'
+
+# Buffers of a frame, at least this large, are written on their own,
+# rather than joined with the others.
+_SEGMENT_SIZE = 64 * 1024
+
+# A single item of item stream: type byte, escaped value and terminator.
+_ITEM_RE = re.compile(b'.((?:[^\x00\xFF]|\xFF.)*)\x00', re.DOTALL)
+
+
+def escape(arg, encoding):
+    """Convert a single request argument to a buffer, ready to be sent.
+
+    Strings are encoded with given encoding, other non-buffer values
+        are converted to strings first. Null and 0xFF bytes are prefixed
+        with 0xFF, copying the data only if it contains any of those.
+
+    :param arg: An argument to convert.
+    :type arg: str|bytes|bytearray|memoryview|object
+    :param encoding: An encoding to use for strings.
+    :type encoding: str
+    :rtype: bytes|bytearray|memoryview
     """
+    if isinstance(arg, str):
+        arg = arg.encode(encoding)
+    elif isinstance(arg, memoryview):
+        if _ESCAPE_RE.search(arg) is None:
+            return arg
+        arg = arg.tobytes()
+    elif not isinstance(arg, (bytes, bytearray)):
+        arg = str(arg).encode(encoding)
+
+    if b'\x00' not in arg and b'\xFF' not in arg:
+        return arg
+    return arg.replace(b'\xFF', b'\xFF\xFF').replace(b'\x00', b'\xFF\x00')
 
-    def wrapper(func):
 
-        @functools.wraps(func)
-        def wrapped(*args, **kwargs):
-            if arg_positions:
-                new_args = []
-                for pos, arg in enumerate(args):
-                    if pos in arg_positions and isinstance(arg, str):
-                        arg = arg.encode('utf-8')
-                    new_args.append(arg)
-                args = tuple(new_args)
-            return func(*args, **kwargs)
+def unescape(data):
+    """Remove 0xFF prefixes from escaped bytes, received from server.
+
+    :type data: bytes|bytearray
+    :rtype: bytes
+    """
+    if b'\xFF' not in data:
+        return bytes(data)
+    return _UNESCAPE_RE.sub(b'\\1', data)
+
+
+@asyncio.coroutine
+def read_string(reader, head=b''):
+    """Read null-terminated string, sent by server.
+
+    :param reader: A reader to read from.
+    :type reader: asyncio.StreamReader
+    :param head: Leading bytes of the string, already read.
+    :type head: bytes
+    :returns: Unescaped string without terminator.
+    :rtype: bytes
+    """
+    if head == _TERM:
+        return b''
+    buf = bytearray(head)
+    while True:
+        try:
+            buf += yield from reader.readuntil(_TERM)
+        except asyncio.LimitOverrunError as e:
+            # Message is larger than reader buffer limit; drain buffer.
+            buf += yield from reader.readexactly(e.consumed)
+            continue
+        del buf[-1]
+        # Null byte, escaped with odd number of 0xFF, is a part of data.
+        if (len(buf) - len(buf.rstrip(b'\xFF'))) % 2:
+            buf += _TERM
+            continue
+        return unescape(buf)
+
+
+@asyncio.coroutine
+def read_items(reader, head=b''):
+    """Read item stream of RESULTS response, up to its end marker.
+
+    Items are returned as a single raw buffer, so that callers may parse
+        them in bulk, instead of creating an object per item.
+
+    :param reader: A reader to read from.
+    :type reader: asyncio.StreamReader
+    :param head: The first byte of the stream, already read.
+    :type head: bytes
+    :returns: Escaped items, each prefixed with type byte and
+        terminated with null byte.
+    :rtype: bytes
+    """
+    buf = bytearray()
+    while True:
+        if not head:
+            head = yield from reader.readexactly(1)
+        if head == _TERM:
+            return bytes(buf)
+        buf += head
+        head = b''
 
-        return wrapped
+        while True:
+            try:
+                buf += yield from reader.readuntil(_TERM + _TERM)
+            except asyncio.LimitOverrunError as e:
+                buf += yield from reader.readexactly(e.consumed)
+                continue
+            break
 
-    return wrapper
+        # Item terminator is followed by end marker, unless the first
+        #  null byte is escaped, and so is a part of item value.
+        end = i = len(buf) - 2
+        while i and buf[i - 1] == 0xFF:
+            i -= 1
+        if not (end - i) % 2:
+            return bytes(buf[:-1])
+
+
+def split_items(items):
+    """Split item stream into unescaped item values.
+
+    :param items: Items, as returned by C{read_items()}.
+    :type items: bytes
+    :rtype: list[bytes]
+    """
+    if b'\xFF' not in items:
+        return [item[1:] for item in items.split(_TERM)[:-1]]
+    return [unescape(m.group(1)) for m in _ITEM_RE.finditer(items)]
+
+
+def item_tokens(items):
+    """Split item stream of atomic values without whitespace, such as
+        numbers, replacing type bytes in bulk, one pass per distinct type.
+
+    :param items: Items, as returned by C{read_items()}.
+    :type items: bytes
+    :rtype: list[bytes]
+    """
+    if not items:
+        return []
+    if b'\xFF' in items:
+        return split_items(items)
+
+    data = items[1:-1]
+    while True:
+        i = data.find(_TERM)
+        if i < 0:
+            return data.split()
+        data = data.replace(data[i:i + 2], b' ')
+
+
+def build_frame(code, *args, encoding):
+    """Build request frame as a list of buffers, to be written
+        with C{write_frame()} without concatenating large ones.
+
+    :param code: A protocol command code, or empty bytes for
+        plain BaseX commands.
+    :type code: bytes
+    :param args: Request arguments, each terminated with null byte.
+    :param encoding: An encoding to use for string arguments.
+    :type encoding: str
+    :rtype: list[bytes|bytearray|memoryview]
+    """
+    frame = [code] if code else []
+    for arg in args:
+        frame.append(escape(arg, encoding))
+        frame.append(_TERM)
+    return frame
+
+
+def write_frame(writer, buffers):
+    """Write request frame, copying only its small buffers.
+
+    C{writelines()} of asyncio transports joins all buffers to a single
+        bytes object, copying the whole frame. Instead, runs of buffers,
+        smaller than C{_SEGMENT_SIZE}, are joined and written at once,
+        while larger buffers are passed to C{write()} as is.
+
+    :param writer: A stream writer or transport to write to.
+    :type writer: asyncio.StreamWriter|asyncio.WriteTransport
+    :param buffers: Buffers of a frame, or several consecutive frames.
+    :type buffers: list[bytes|bytearray|memoryview]
+    """
+    small = []
+    for buffer in buffers:
+        if len(buffer) < _SEGMENT_SIZE:
+            small.append(buffer)
+            continue
+        if small:
+            writer.write(b''.join(small))
+            small = []
+        writer.write(buffer)
+    if small:
+        writer.write(b''.join(small))
 
 
 def communicate_with_server(connection, to_send, *, loop,
-                            success_term_twice=False):
+                            success_term_twice=False, error_follows=True,
+                            items=False):
     """Send data and wait response from the server.
 
-    :param to_send: A bytes to send to remote end.
-    :type to_send: bytes
+    :param to_send: A bytes, or a frame of buffers, to send to remote end.
+    :type to_send: bytes|list
     :param connection: A baseX connection.
     :type connection: aiobasex.BaseXConnection
     :param success_term_twice: Wait until success term arrives twice.
     :type success_term_twice: bool
+    :param error_follows: Whether error status is followed by error message.
+    :type error_follows: bool
+    :param items: Whether response is an item stream.
+    :type items: bool
     :returns: Pair of values, first containing possible error,
                 second - the result of execution.
     :rtype tuple[str|None,str|None]
@@ -44,7 +227,9 @@ def communicate_with_server(connection, to_send, *, loop,
     waiter = asyncio.Future(loop=loop)
 
     connection.send_msg(to_send, waiter=waiter,
-                        success_term_twice=success_term_twice)
+                        success_term_twice=success_term_twice,
+                        error_follows=error_follows,
+                        items=items)
 
     error, result = yield from waiter
 
@@ -0,0 +1,119 @@
+"""Micro-benchmark of request frame writes through an asyncio transport.
+
+Writes BIND requests to one end of a socket pair, while the other end
+    is drained, in three ways:
+    - concat: arguments concatenated to a single bytes object, passed to
+        C{write()}, as it was done before C{aiobasex.utils.build_frame}
+        was introduced (arguments are not escaped);
+    - writelines: frame of buffers, passed to C{writelines()};
+    - segments: frame of buffers, written with
+        C{aiobasex.utils.write_frame()}.
+
+Reported per request:
+    - peak traced memory while writing, in multiples of payload size,
+        which is the number of payload copies made, including the one
+        C{writelines()} joins frame to, and the buffer, transport keeps
+        unsent data in;
+    - median wall time of building and writing the frame.
+
+Usage: PYTHONPATH=. python benchmarks/frame_allocations.py \
+    [payload size...]
+"""
+import asyncio
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+
+from aiobasex.utils import build_frame, write_frame
+
+
+TERM = b'\x00'
+BIND = b'\x03'
+REQUESTS = 200
+
+
+def concat_frame(writer, query_id, var, value, type):
+    args = []
+    for arg in (query_id, var, value, type):
+        if isinstance(arg, str):
+            arg = arg.encode('utf-8')
+        args.append(arg)
+    query_id, var, value, type = args
+    writer.write(BIND + query_id + TERM + var + TERM + value + TERM +
+                 type + TERM)
+
+
+def writelines_frame(writer, query_id, var, value, type):
+    writer.writelines(build_frame(BIND, query_id, var, value, type,
+                                  encoding='utf-8'))
+
+
+def segments_frame(writer, query_id, var, value, type):
+    write_frame(writer, build_frame(BIND, query_id, var, value, type,
+                                    encoding='utf-8'))
+
+
+def drain(sock, buffer):
+    try:
+        while sock.recv_into(buffer):
+            pass
+    except BlockingIOError:
+        pass
+
+
+async def flushed(transport):
+    while transport.get_write_buffer_size():
+        await asyncio.sleep(0.001)
+
+
+async def measure(func, payload, writer):
+    args = (writer, b'1', 'var', payload, '')
+    peaks = []
+    for _ in range(REQUESTS):
+        tracemalloc.start()
+        func(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        await flushed(writer.transport)
+
+    seconds = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        func(*args)
+        seconds.append(time.perf_counter() - start)
+        await flushed(writer.transport)
+    return statistics.median(peaks), statistics.median(seconds)
+
+
+async def run(sizes):
+    sock, peer = socket.socketpair()
+    peer.setblocking(False)
+    asyncio.get_event_loop().add_reader(
+        peer.fileno(), drain, peer, bytearray(1024 * 1024))
+    _, writer = await asyncio.open_connection(sock=sock)
+
+    for size in sizes:
+        for kind, payload in (('bytes', b'x' * size), ('str', 'x' * size)):
+            print('{} payload of {} bytes:'.format(kind, size))
+            for name, func in (('concat', concat_frame),
+                               ('writelines', writelines_frame),
+                               ('segments', segments_frame)):
+                peak, seconds = await measure(func, payload, writer)
+                print('  {:<10} peak {:>9.0f} bytes ({:.2f} payloads), '
+                      '{:.1f} us/request'.format(
+                          name, peak, peak / size, seconds * 1e6))
+
+    asyncio.get_event_loop().remove_reader(peer.fileno())
+    writer.close()
+    peer.close()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 1024 * 1024]
+    asyncio.get_event_loop().run_until_complete(run(sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Micro-benchmark of numeric results conversion.
+
+Compares conversion of item stream of RESULTS response to a list of
+    floats through decoded strings (as C{BaseXQuery.results()} returns
+    them), with C{aiobasex.arrays.to_array()} over raw item tokens.
+
+Usage: PYTHONPATH=. python benchmarks/results_array.py [number of items]
+"""
+import sys
+import timeit
+
+from aiobasex.arrays import to_array
+from aiobasex.utils import item_tokens, split_items
+
+
+# Arbitrary item type bytes of two numeric types.
+TYPES = (b'\x52', b'\x53')
+
+
+def item_stream(n):
+    return b''.join(TYPES[i % 2] + str(i * 1.25).encode() + b'\x00'
+                    for i in range(n))
+
+
+def via_strings(items):
+    results = '\n'.join(item.decode('utf-8') for item in split_items(items))
+    return [float(value) for value in results.split('\n')]
+
+
+def via_array(items):
+    return to_array(item_tokens(items), 'd')
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    items = item_stream(n)
+    print('{} items, {} bytes:'.format(n, len(items)))
+    for name, func in (('strings', via_strings), ('array', via_array)):
+        seconds = min(timeit.repeat(lambda: func(items), number=1, repeat=3))
+        print('  {:<8} {:.1f} ms, {:.0f} ns/item'.format(
+            name, seconds * 1e3, seconds * 1e9 / n))
+
+
+if __name__ == '__main__':
+    main()
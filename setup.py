@@ -36,6 +36,7 @@ args = dict(
     author_email='mksh@null.net',
     url='https://github.com/mksh/aiobasex/',
     packages=['aiobasex'],
+    extras_require={'numpy': ['numpy']},
     license='MIT',
     cmdclass={'test': TestSuite},
 )